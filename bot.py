@@ -5,10 +5,11 @@ import logging
 import re
 import csv
 import time
+import shutil
 import asyncio
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from urllib.parse import urlparse
+import tempfile
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, Bot
+from telegram.error import TelegramError
 from telegram.ext import (
     ApplicationBuilder, CommandHandler, CallbackQueryHandler,
     MessageHandler, ConversationHandler, ContextTypes, filters
@@ -16,44 +17,34 @@ from telegram.ext import (
 import openpyxl
 from scrapers import (
     youtube_scraper, 
+    youtube_channel_scraper,
     tiktok_post_details_scraper, 
     tiktok_channel_posts_scraper, 
     dailymotion_scraper, 
     okru_scraper
 )
+from exporters import EXPORT_FORMATS, DEFAULT_EXPORT_FORMAT, export_rows, compress_if_too_large
+from tracing import (
+    start_trace, end_trace, span, record_span,
+    start_profile, end_profile, run_in_executor, profile_report
+)
+from domains import open_text, write_domains_csv, write_aggregate_csv
+from watchlist import (
+    WATCH_TARGETS,
+    GROWTH_FIELDS,
+    add_watch,
+    remove_watch,
+    get_watch,
+    load_watchlists,
+    due_watches,
+    mark_run,
+    record_snapshot,
+    growth_rows
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def extract_domain_fast(url):
-    try:
-        if not url.startswith(('http://', 'https://')):
-            url = 'http://' + url
-        parsed = urlparse(url)
-        domain = parsed.netloc
-        if domain.startswith('www.'):
-            domain = domain[4:]
-        return domain
-    except:
-        return ""
-
-def extract_domains_bulk(urls):
-    results = []
-    def extract_single(url):
-        return {"URL": url, "Domain": extract_domain_fast(url)}
-    
-    with ThreadPoolExecutor(max_workers=50) as executor:
-        future_to_url = {executor.submit(extract_single, url): url for url in urls}
-        for future in as_completed(future_to_url):
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                url = future_to_url[future]
-                results.append({"URL": url, "Domain": ""})
-                logger.error(f"Error extracting domain from {url}: {e}")
-    return results
-
 PLATFORMS = {
     "YouTube": youtube_scraper,
     "TikTok": None,
@@ -69,10 +60,19 @@ TEMPLATE_FILES = {
     "Ok.ru": "templates/UGC-Template.xlsx",
 }
 
-SELECT_PLATFORM, SELECT_TIKTOK_MODE, GET_INPUT = range(3)
+SELECT_PLATFORM, SELECT_TIKTOK_MODE, SELECT_YOUTUBE_MODE, SELECT_DOMAIN_MODE, GET_INPUT = range(5)
+
+TIKTOK_REFRESH_RECENT = int(os.getenv("TIKTOK_REFRESH_RECENT", "5"))
+ADMIN_USER_IDS = {int(uid) for uid in os.getenv("ADMIN_USER_IDS", "").split(",") if uid.strip()}
+DOMAIN_GZIP_THRESHOLD = int(os.getenv("DOMAIN_GZIP_THRESHOLD", str(5 * 1024 * 1024)))
+# Bots can only download files up to 20 MB through the Bot API.
+TELEGRAM_DOWNLOAD_LIMIT = 20 * 1024 * 1024
+WATCH_CHECK_INTERVAL = int(os.getenv("WATCH_CHECK_INTERVAL", "300"))
+WATCH_MIN_INTERVAL_HOURS = float(os.getenv("WATCH_MIN_INTERVAL_HOURS", "1"))
 
 URL_PATTERNS = {
     "YouTube": re.compile(r"^(https?:\/\/)?(www\.)?((youtube\.com\/watch\?v=)|youtube\.com\/shorts\/|youtu\.be\/)[a-zA-Z0-9_-]{11}($|&|/|\?)"),
+    "YouTube_Channel": re.compile(r"^(https?:\/\/)?(www\.|m\.)?youtube\.com\/(channel\/UC[\w-]{22}|@[\w.-]+|user\/[\w.-]+)([\/?].*)?$|^@[\w.-]+$|^UC[\w-]{22}$"),
     "TikTok": re.compile(r"^(https?:\/\/)?(www\.)?tiktok\.com\/@[\w._-]+\/video\/\d+"),
     "TikTok_Profile": re.compile(r"^(https?:\/\/)?(www\.)?tiktok\.com\/@[\w._-]+$|^@?[\w._-]+$"),
     "Dailymotion": re.compile(r"^(https?:\/\/)?(www\.)?dailymotion\.com\/video\/[a-zA-Z0-9]+$"),
@@ -103,7 +103,7 @@ fields_mapping = {
     }
 }
 
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+def platform_keyboard():
     keyboard = [
         [InlineKeyboardButton("🎥 YouTube", callback_data="YouTube")],
         [InlineKeyboardButton("🎵 TikTok", callback_data="TikTok")],
@@ -111,9 +111,18 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         [InlineKeyboardButton("🎬 Ok.ru", callback_data="Ok.ru")],
         [InlineKeyboardButton("🌐 Domain Extractor", callback_data="Domain Extractor")]
     ]
+    return InlineKeyboardMarkup(keyboard)
+
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # /start <format> picks the export format for this job; otherwise the /format default applies.
+    export_format = context.args[0].lower() if context.args else context.user_data.get('default_export_format', DEFAULT_EXPORT_FORMAT)
+    if export_format not in EXPORT_FORMATS:
+        await update.message.reply_text(f"❌ Unknown format. Available: {', '.join(EXPORT_FORMATS)}")
+        return ConversationHandler.END
+    context.user_data['export_format'] = export_format
     await update.message.reply_text(
-        "🚀 *Platform Scraper Bot*\n\nSelect a platform to scrape:",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        f"🚀 *Platform Scraper Bot*\n\nOutput format: `{export_format}`\nSelect a platform to scrape:",
+        reply_markup=platform_keyboard(),
         parse_mode='Markdown'
     )
     return SELECT_PLATFORM
@@ -127,6 +136,7 @@ async def platform_selected(update: Update, context: ContextTypes.DEFAULT_TYPE):
         keyboard = [
             [InlineKeyboardButton("📹 Post Details Scraper", callback_data="tiktok_post_details")],
             [InlineKeyboardButton("📺 Channel Post Extractor", callback_data="tiktok_channel_posts")],
+            [InlineKeyboardButton("🔁 Channel New Posts (Delta)", callback_data="tiktok_channel_delta")],
             [InlineKeyboardButton("⬅️ Back to Platforms", callback_data="back_to_platforms")]
         ]
         await query.edit_message_text(
@@ -135,11 +145,49 @@ async def platform_selected(update: Update, context: ContextTypes.DEFAULT_TYPE):
                  "📹 *Post Details Scraper*\n"
                  "Extract data from specific video URLs\n\n"
                  "📺 *Channel Post Extractor*\n"
-                 "Extract all videos from profile(s)",
+                 "Extract all videos from profile(s)\n\n"
+                 "🔁 *Channel New Posts (Delta)*\n"
+                 "Extract only posts added since the last crawl",
             reply_markup=InlineKeyboardMarkup(keyboard),
             parse_mode='Markdown'
         )
         return SELECT_TIKTOK_MODE
+
+    if platform == "YouTube":
+        keyboard = [
+            [InlineKeyboardButton("🎬 Video Details Scraper", callback_data="youtube_video_details")],
+            [InlineKeyboardButton("📺 Channel Video Extractor", callback_data="youtube_channel_videos")],
+            [InlineKeyboardButton("⬅️ Back to Platforms", callback_data="back_to_platforms")]
+        ]
+        await query.edit_message_text(
+            text="🎥 *YouTube Scraper Options*\n\n"
+                 "Choose scraping mode:\n\n"
+                 "🎬 *Video Details Scraper*\n"
+                 "Extract data from specific video URLs\n\n"
+                 "📺 *Channel Video Extractor*\n"
+                 "Extract all videos from channel(s)",
+            reply_markup=InlineKeyboardMarkup(keyboard),
+            parse_mode='Markdown'
+        )
+        return SELECT_YOUTUBE_MODE
+
+    if platform == "Domain Extractor":
+        keyboard = [
+            [InlineKeyboardButton("📄 Domain per URL", callback_data="domain_per_url")],
+            [InlineKeyboardButton("📊 Domain Counts", callback_data="domain_aggregate")],
+            [InlineKeyboardButton("⬅️ Back to Platforms", callback_data="back_to_platforms")]
+        ]
+        await query.edit_message_text(
+            text="🌐 *Domain Extractor Options*\n\n"
+                 "Choose output:\n\n"
+                 "📄 *Domain per URL*\n"
+                 "Registrable domain for every URL, in input order\n\n"
+                 "📊 *Domain Counts*\n"
+                 "URL count and first line number per domain",
+            reply_markup=InlineKeyboardMarkup(keyboard),
+            parse_mode='Markdown'
+        )
+        return SELECT_DOMAIN_MODE
     
     await query.edit_message_text(
         f"✅ You selected *{platform}*.\n\n"
@@ -153,16 +201,9 @@ async def tiktok_mode_selected(update: Update, context: ContextTypes.DEFAULT_TYP
     mode = query.data
     
     if mode == "back_to_platforms":
-        keyboard = [
-            [InlineKeyboardButton("🎥 YouTube", callback_data="YouTube")],
-            [InlineKeyboardButton("🎵 TikTok", callback_data="TikTok")],
-            [InlineKeyboardButton("📺 Dailymotion", callback_data="Dailymotion")],
-            [InlineKeyboardButton("🎬 Ok.ru", callback_data="Ok.ru")],
-            [InlineKeyboardButton("🌐 Domain Extractor", callback_data="Domain Extractor")]
-        ]
         await query.edit_message_text(
             "🚀 *Platform Scraper Bot*\n\nSelect a platform to scrape:",
-            reply_markup=InlineKeyboardMarkup(keyboard),
+            reply_markup=platform_keyboard(),
             parse_mode='Markdown'
         )
         return SELECT_PLATFORM
@@ -188,6 +229,68 @@ async def tiktok_mode_selected(update: Update, context: ContextTypes.DEFAULT_TYP
                  "• Multiple profiles separated by newlines",
             parse_mode='Markdown'
         )
+    elif mode == "tiktok_channel_delta":
+        context.user_data['tiktok_mode'] = 'channel_delta'
+        await query.edit_message_text(
+            text="🔁 *TikTok Channel New Posts (Delta)*\n\n"
+                 "Send me TikTok profile URLs/usernames or upload an Excel file\n\n"
+                 "Only posts newer than the last crawl of each profile are extracted, "
+                 f"plus refreshed metrics for the {TIKTOK_REFRESH_RECENT} most recent known posts.\n"
+                 "The first crawl of a profile extracts all of its videos.",
+            parse_mode='Markdown'
+        )
+    return GET_INPUT
+
+async def youtube_mode_selected(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    mode = query.data
+
+    if mode == "back_to_platforms":
+        await query.edit_message_text(
+            "🚀 *Platform Scraper Bot*\n\nSelect a platform to scrape:",
+            reply_markup=platform_keyboard(),
+            parse_mode='Markdown'
+        )
+        return SELECT_PLATFORM
+    elif mode == "youtube_video_details":
+        context.user_data['youtube_mode'] = 'video_details'
+        await query.edit_message_text(
+            text="🎬 *YouTube Video Details Scraper*\n\n"
+                 "Send me YouTube video URLs line-by-line or upload an Excel file with URLs.",
+            parse_mode='Markdown'
+        )
+    elif mode == "youtube_channel_videos":
+        context.user_data['youtube_mode'] = 'channel_videos'
+        await query.edit_message_text(
+            text="📺 *YouTube Channel Video Extractor*\n\n"
+                 "Send me YouTube channel URLs/handles or upload an Excel file\n\n"
+                 "Supported formats:\n"
+                 "• https://www.youtube.com/@handle\n"
+                 "• https://www.youtube.com/channel/UC...\n"
+                 "• @handle\n"
+                 "• Multiple channels separated by newlines",
+            parse_mode='Markdown'
+        )
+    return GET_INPUT
+
+async def domain_mode_selected(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    mode = query.data
+
+    if mode == "back_to_platforms":
+        await query.edit_message_text(
+            "🚀 *Platform Scraper Bot*\n\nSelect a platform to scrape:",
+            reply_markup=platform_keyboard(),
+            parse_mode='Markdown'
+        )
+        return SELECT_PLATFORM
+    context.user_data['domain_mode'] = 'aggregate' if mode == "domain_aggregate" else 'per_url'
+    await query.edit_message_text(
+        text="🌐 *Domain Extractor*\n\n"
+             "Send me URLs line-by-line, or upload an Excel file or a text file "
+             "with one URL per line (.txt or .txt.gz)",
+        parse_mode='Markdown'
+    )
     return GET_INPUT
 
 def extract_urls_from_excel(file_bytes):
@@ -209,8 +312,165 @@ def extract_urls_from_excel(file_bytes):
 
 async def input_received(update: Update, context: ContextTypes.DEFAULT_TYPE):
     platform = context.user_data.get('platform')
-    tiktok_mode = context.user_data.get('tiktok_mode')
+    mode = selected_mode(context, platform)
+    job_name = f"{platform}{' ' + mode if mode else ''}"
+    profile_chat_id = context.bot_data.pop('profile_next', None)
+    profiles = None
+    if profile_chat_id:
+        profiles, profile_token = start_profile()
+    trace, token = start_trace(job_name)
+    state = GET_INPUT
+    try:
+        state = await process_input(update, context)
+        return state
+    finally:
+        end_trace(trace, token)
+        if profiles:
+            end_profile(profiles, profile_token)
+        if state == GET_INPUT:
+            # Input was rejected, so no job ran; keep the profiling request for the next one.
+            if profile_chat_id:
+                context.bot_data['profile_next'] = profile_chat_id
+        else:
+            logger.info(f"Job trace: {trace.one_line()}")
+            await send_job_reports(update, context, trace, profiles, profile_chat_id)
+
+async def send_job_reports(update: Update, context: ContextTypes.DEFAULT_TYPE, trace, profiles, profile_chat_id):
+    stamp = time.strftime('%Y%m%d_%H%M%S')
+    try:
+        if context.user_data.get('trace_report'):
+            await update.message.reply_document(
+                document=io.BytesIO(trace.summary().encode()),
+                filename=f"trace_{stamp}.txt",
+                caption=f"⏱️ {trace.one_line()}"
+            )
+        if profiles:
+            await context.bot.send_document(
+                chat_id=profile_chat_id,
+                document=io.BytesIO(profile_report(profiles).encode()),
+                filename=f"profile_{stamp}.txt",
+                caption=f"🔬 Profile for job {trace.name} from user {update.effective_user.id}\n\n"
+                        f"Covers the event loop while the job was active (other jobs' handlers included) "
+                        f"and the job's export/extraction work in {len(profiles) - 1} worker thread call(s)."
+            )
+    except Exception as e:
+        logger.error(f"Could not send job reports: {e}")
+
+async def domain_input_received(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    started = time.perf_counter()
+    aggregate = context.user_data.get('domain_mode') == 'aggregate'
+    tmp_dir = tempfile.mkdtemp(prefix="domains_")
+    input_path = None
+    lines = []
+    compress = False
+
+    try:
+        if update.message.document:
+            doc = update.message.document
+            file_name = doc.file_name.lower()
+            if not file_name.endswith(('.xls', '.xlsx', '.txt', '.txt.gz')):
+                await update.message.reply_text("❌ Please upload an Excel file (.xls or .xlsx) or a text file (.txt or .txt.gz).")
+                return GET_INPUT
+            if (doc.file_size or 0) > TELEGRAM_DOWNLOAD_LIMIT:
+                await update.message.reply_text(
+                    f"❌ File is {doc.file_size / 1024 / 1024:.1f} MB, but bots can only download files up to "
+                    f"{TELEGRAM_DOWNLOAD_LIMIT // 1024 // 1024} MB.\n\n"
+                    "Compress it as .txt.gz, split it, or run the extractor locally:\n"
+                    "python domains.py [--aggregate] <input.txt[.gz]> <output.csv[.gz]>"
+                )
+                return GET_INPUT
+            try:
+                file_obj = await doc.get_file()
+                if file_name.endswith(('.xls', '.xlsx')):
+                    data = await file_obj.download_as_bytearray()
+                else:
+                    input_path = os.path.join(tmp_dir, "input.txt.gz" if file_name.endswith('.gz') else "input.txt")
+                    await file_obj.download_to_drive(input_path)
+            except TelegramError as e:
+                logger.error(f"Error downloading domain input: {e}")
+                await update.message.reply_text(f"❌ Could not download the file: {e}")
+                return GET_INPUT
+            if file_name.endswith(('.xls', '.xlsx')):
+                lines = extract_urls_from_excel(data)
+                if not lines:
+                    await update.message.reply_text("❌ Could not extract URLs from Excel file.")
+                    return GET_INPUT
+            compress = (doc.file_size or 0) > DOMAIN_GZIP_THRESHOLD
+        else:
+            lines = update.message.text.strip().splitlines()
+            if not any(l.strip() for l in lines):
+                await update.message.reply_text("❌ No URLs provided!")
+                return GET_INPUT
+
+        record_span("ingestion", "domain input", started)
+        processing_msg = await update.message.reply_text(
+            f"🔄 Processing URLs for Domain Extractor ({'Domain Counts' if aggregate else 'Domain per URL'})..."
+        )
+        file_name = f"{'domain_counts' if aggregate else 'domains'}.csv{'.gz' if compress else ''}"
+        output_path = os.path.join(tmp_dir, file_name)
+
+        def extract():
+            src = open_text(input_path) if input_path else None
+            try:
+                with open_text(output_path, "w") as dst:
+                    if aggregate:
+                        return write_aggregate_csv(src or lines, dst)
+                    return write_domains_csv(src or lines, dst), None
+            finally:
+                if src:
+                    src.close()
+
+        try:
+            start_time = time.time()
+            with span("parsing", "domain extraction"):
+                processed, distinct = await run_in_executor(extract)
+            end_time = time.time()
+            await processing_msg.delete()
+            caption = f"✅ Domain extraction completed!\n\n📊 Processed: {processed} URLs\n"
+            if distinct is not None:
+                caption += f"🌐 Distinct domains: {distinct}\n"
+            caption += f"⏱️ Time taken: {end_time - start_time:.2f} seconds"
+            with span("output", "upload"), open(output_path, "rb") as output:
+                await update.message.reply_document(document=output, filename=file_name, caption=caption)
+        except Exception as e:
+            logger.exception(f"Error in domain extraction: {e}")
+            await processing_msg.edit_text(f"❌ Error during domain extraction: {e}")
+        return ConversationHandler.END
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def selected_mode(context: ContextTypes.DEFAULT_TYPE, platform):
+    if platform == "TikTok":
+        return context.user_data.get('tiktok_mode')
+    if platform == "YouTube":
+        return context.user_data.get('youtube_mode')
+    return None
+
+async def run_scraper(platform, mode, urls, chat_id=None, incomplete=None):
+    if platform == "YouTube" and mode == "channel_videos":
+        return await youtube_channel_scraper(urls, incomplete)
+    if platform == "TikTok":
+        if mode == "post_details":
+            return await tiktok_post_details_scraper(urls)
+        elif mode == "channel_posts":
+            return await tiktok_channel_posts_scraper(urls)
+        elif mode == "channel_delta":
+            return await tiktok_channel_posts_scraper(urls, delta=True, refresh_recent=TIKTOK_REFRESH_RECENT,
+                                                      scope=chat_id)
+        raise ValueError("Invalid TikTok mode!")
+    scraper_func = PLATFORMS.get(platform)
+    if not scraper_func:
+        raise ValueError(f"No scraper found for {platform}")
+    return await scraper_func(urls)
+
+async def process_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    started = time.perf_counter()
+    platform = context.user_data.get('platform')
+    mode = selected_mode(context, platform)
     urls = []
+
+    if platform == "Domain Extractor":
+        return await domain_input_received(update, context)
     
     if update.message.document:
         doc = update.message.document
@@ -230,7 +490,7 @@ async def input_received(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ No URLs provided!")
         return GET_INPUT
 
-    if platform == "TikTok" and tiktok_mode == "channel_posts":
+    if platform == "TikTok" and mode in ("channel_posts", "channel_delta"):
         pattern = URL_PATTERNS.get("TikTok_Profile")
         invalid_urls = [u for u in urls if not pattern.match(u)]
         if invalid_urls:
@@ -239,7 +499,25 @@ async def input_received(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"\n{'...' if len(invalid_urls) > 5 else ''}\n\nPlease send valid TikTok profiles."
             )
             return GET_INPUT
-    elif platform != "Domain Extractor" and platform != "TikTok":
+    elif platform == "YouTube" and mode == "channel_videos":
+        pattern = URL_PATTERNS.get("YouTube_Channel")
+        legacy_urls = [u for u in urls if re.search(r"youtube\.com\/c\/", u)]
+        if legacy_urls:
+            await update.message.reply_text(
+                f"❌ Legacy /c/ channel URLs are not supported:\n" + "\n".join(legacy_urls[:5]) +
+                f"\n{'...' if len(legacy_urls) > 5 else ''}\n\n"
+                "A /c/ name does not always match the channel's handle, so it could resolve to a different channel. "
+                "Please send the channel's @handle or /channel/UC... URL instead."
+            )
+            return GET_INPUT
+        invalid_urls = [u for u in urls if not pattern.match(u)]
+        if invalid_urls:
+            await update.message.reply_text(
+                f"❌ Invalid channel URLs/handles:\n" + "\n".join(invalid_urls[:5]) + 
+                f"\n{'...' if len(invalid_urls) > 5 else ''}\n\nPlease send valid YouTube channels."
+            )
+            return GET_INPUT
+    elif platform != "TikTok":
         pattern = URL_PATTERNS.get(platform)
         invalid_urls = [u for u in urls if not pattern.match(u)]
         if invalid_urls:
@@ -248,7 +526,7 @@ async def input_received(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"\n{'...' if len(invalid_urls) > 5 else ''}\n\nPlease send valid URLs."
             )
             return GET_INPUT
-    elif platform == "TikTok" and tiktok_mode == "post_details":
+    elif platform == "TikTok" and mode == "post_details":
         pattern = URL_PATTERNS.get("TikTok")
         invalid_urls = [u for u in urls if not pattern.match(u)]
         if invalid_urls:
@@ -258,49 +536,17 @@ async def input_received(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             return GET_INPUT
 
+    record_span("ingestion", f"{len(urls)} URLs", started)
     processing_msg = await update.message.reply_text(
-        f"🔄 Processing {len(urls)} URLs for {platform}{'(' + tiktok_mode.replace('_', ' ').title() + ')' if tiktok_mode else ''}..."
+        f"🔄 Processing {len(urls)} URLs for {platform}{'(' + mode.replace('_', ' ').title() + ')' if mode else ''}..."
     )
 
-    if platform == "Domain Extractor":
-        try:
-            start_time = time.time()
-            rows = extract_domains_bulk(urls)
-            end_time = time.time()
-            output = io.StringIO()
-            writer = csv.DictWriter(output, fieldnames=["URL", "Domain"])
-            writer.writeheader()
-            writer.writerows(rows)
-            output.seek(0)
-            await processing_msg.delete()
-            await update.message.reply_document(
-                document=io.BytesIO(output.getvalue().encode()),
-                filename="domains.csv",
-                caption=f"✅ Domain extraction completed!\n\n"
-                       f"📊 Processed: {len(urls)} URLs\n"
-                       f"⏱️ Time taken: {end_time - start_time:.2f} seconds"
-            )
-            return ConversationHandler.END
-        except Exception as e:
-            logger.exception(f"Error in domain extraction: {e}")
-            await processing_msg.edit_text(f"❌ Error during domain extraction: {e}")
-            return ConversationHandler.END
-
+    incomplete = []
     try:
-        if platform == "TikTok":
-            if tiktok_mode == "post_details":
-                results = await tiktok_post_details_scraper(urls)
-            elif tiktok_mode == "channel_posts":
-                results = await tiktok_channel_posts_scraper(urls)
-            else:
-                await processing_msg.edit_text("❌ Invalid TikTok mode!")
-                return ConversationHandler.END
-        else:
-            scraper_func = PLATFORMS.get(platform)
-            if not scraper_func:
-                await processing_msg.edit_text(f"❌ No scraper found for {platform}")
-                return ConversationHandler.END
-            results = await scraper_func(urls)
+        results = await run_scraper(platform, mode, urls, update.effective_chat.id, incomplete)
+    except ValueError as e:
+        await processing_msg.edit_text(f"❌ {e}")
+        return ConversationHandler.END
     except Exception as e:
         logger.exception(f"Error scraping {platform}: {e}")
         await processing_msg.edit_text(f"❌ Error during scraping: {e}")
@@ -310,46 +556,185 @@ async def input_received(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await processing_msg.edit_text("❌ No data scraped.")
         return ConversationHandler.END
 
+    export_format = context.user_data.get('export_format', DEFAULT_EXPORT_FORMAT)
     template_path = TEMPLATE_FILES.get(platform)
-    if not template_path or not os.path.isfile(template_path):
+    if export_format == "xlsx" and (not template_path or not os.path.isfile(template_path)):
         await processing_msg.edit_text("❌ Template file missing for this platform.")
         return ConversationHandler.END
 
+    mapping = fields_mapping.get(platform)
+    if not mapping:
+        await processing_msg.edit_text("❌ No field mapping found for this platform.")
+        return ConversationHandler.END
+
+    tmp_dir = tempfile.mkdtemp(prefix="export_")
     try:
-        wb = openpyxl.load_workbook(template_path)
-        ws = wb.active
-        mapping = fields_mapping.get(platform)
-        if not mapping:
-            await processing_msg.edit_text("❌ No field mapping found for this platform.")
-            return ConversationHandler.END
-
-        start_row = 2
-        for i, row_data in enumerate(results, start=start_row):
-            for field, col in mapping.items():
-                val = row_data.get(field, "N/A")
-                ws[f"{col}{i}"].value = val
-
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        file_name = f"{platform.replace(' ', '_')}{'_' + tiktok_mode if tiktok_mode else ''}_scraped_output.xlsx"
-        
+        file_name = f"{platform.replace(' ', '_')}{'_' + mode if mode else ''}_scraped_output{EXPORT_FORMATS[export_format]}"
+        output_path = os.path.join(tmp_dir, file_name)
+
+        def export(path):
+            export_rows(results, mapping, export_format, path, template_path)
+            return compress_if_too_large(path)
+
+        with span("output", f"export {export_format}"):
+            output_path = await run_in_executor(export, output_path)
+
+        caption = f"✅ Scraping completed!\n\n📊 Total results: {len(results)}\n"
+        if incomplete:
+            caption += (f"⚠️ Only partly listed after a fetch error: {', '.join(incomplete[:5])}"
+                        f"{'...' if len(incomplete) > 5 else ''}\n")
+        caption += f"📅 Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\nUse /start to scrape again!"
         await processing_msg.delete()
-        await update.message.reply_document(
-            document=output, 
-            filename=file_name,
-            caption=f"✅ Scraping completed!\n\n"
-                   f"📊 Total results: {len(results)}\n"
-                   f"📅 Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-                   f"Use /start to scrape again!"
-        )
+        with span("output", "upload"), open(output_path, "rb") as output:
+            await update.message.reply_document(
+                document=output, 
+                filename=os.path.basename(output_path),
+                caption=caption
+            )
     except Exception as e:
         logger.exception(f"Error creating output file: {e}")
         await processing_msg.edit_text(f"❌ Error creating output file: {e}")
         return ConversationHandler.END
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
 
     return ConversationHandler.END
 
+WATCH_PATTERNS = {
+    "youtube": "YouTube",
+    "tiktok": "TikTok",
+    "tiktok_channel": "TikTok_Profile",
+    "dailymotion": "Dailymotion",
+    "okru": "Ok.ru",
+}
+
+async def watch_add(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    lines = [l.strip() for l in update.message.text.strip().splitlines() if l.strip()]
+    args = lines[0].split()[1:]
+    targets = lines[1:]
+    usage = (
+        "Usage:\n/watch <platform> <interval_hours>\n<url or profile>\n<url or profile>...\n\n"
+        f"Platforms: {', '.join(WATCH_TARGETS)}"
+    )
+    if len(args) != 2 or args[0].lower() not in WATCH_TARGETS or not targets:
+        await update.message.reply_text(usage)
+        return
+    keyword = args[0].lower()
+    try:
+        interval_hours = float(args[1])
+    except ValueError:
+        await update.message.reply_text(usage)
+        return
+    if interval_hours < WATCH_MIN_INTERVAL_HOURS:
+        await update.message.reply_text(f"❌ Minimum interval is {WATCH_MIN_INTERVAL_HOURS} hours.")
+        return
+    pattern = URL_PATTERNS[WATCH_PATTERNS[keyword]]
+    invalid_urls = [u for u in targets if not pattern.match(u)]
+    if invalid_urls:
+        await update.message.reply_text(
+            f"❌ Invalid URLs:\n" + "\n".join(invalid_urls[:5]) +
+            f"\n{'...' if len(invalid_urls) > 5 else ''}\n\nPlease send valid URLs."
+        )
+        return
+    watch = add_watch(update.effective_chat.id, keyword, targets, interval_hours)
+    await update.message.reply_text(
+        f"👀 Watchlist #{watch['id']} created: {len(targets)} {keyword} targets every {interval_hours:g}h.\n"
+        f"First snapshot runs within {WATCH_CHECK_INTERVAL // 60} minutes."
+    )
+
+async def watch_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    watches = [w for w in load_watchlists() if w["chat_id"] == update.effective_chat.id]
+    if not watches:
+        await update.message.reply_text("No watchlists. Use /watch to create one.")
+        return
+    lines = []
+    for w in watches:
+        mode = f" ({w['tiktok_mode'].replace('_', ' ')})" if w["tiktok_mode"] else ""
+        last_run = time.strftime('%Y-%m-%d %H:%M', time.localtime(w["last_run"])) if w["last_run"] else "never"
+        lines.append(f"#{w['id']} {w['platform']}{mode}: {len(w['targets'])} targets, every {w['interval_hours']:g}h, last run {last_run}")
+    await update.message.reply_text("👀 Watchlists:\n\n" + "\n".join(lines))
+
+async def watch_remove(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if len(context.args) != 1 or not context.args[0].isdigit():
+        await update.message.reply_text("Usage: /unwatch <id>")
+        return
+    if remove_watch(update.effective_chat.id, int(context.args[0])):
+        await update.message.reply_text(f"✅ Watchlist #{context.args[0]} removed. Its snapshots stay in the store.")
+    else:
+        await update.message.reply_text(f"❌ No watchlist #{context.args[0]}.")
+
+async def watch_export(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not context.args or not context.args[0].isdigit() or (len(context.args) > 1 and not context.args[1].isdigit()):
+        await update.message.reply_text("Usage: /watch_export <id> [days]")
+        return
+    watch = get_watch(update.effective_chat.id, int(context.args[0]))
+    if not watch:
+        await update.message.reply_text(f"❌ No watchlist #{context.args[0]}.")
+        return
+    days = int(context.args[1]) if len(context.args) > 1 else 0
+    since = int(time.time()) - days * 86400 if days else 0
+    rows = await run_in_executor(growth_rows, watch, since)
+    if not rows:
+        await update.message.reply_text("❌ No snapshots recorded yet.")
+        return
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=GROWTH_FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+    await update.message.reply_document(
+        document=io.BytesIO(output.getvalue().encode()),
+        filename=f"watchlist_{watch['id']}_growth.csv",
+        caption=f"📈 Growth for watchlist #{watch['id']}"
+                f"{f' over the last {days} days' if days else ''}\n\n"
+                f"📊 Series: {len(rows)}"
+    )
+
+async def run_due_watchlists(context: ContextTypes.DEFAULT_TYPE):
+    for watch in due_watches():
+        started = time.time()
+        try:
+            results = await run_scraper(watch["platform"], watch["tiktok_mode"], watch["targets"], watch["chat_id"])
+            count = await run_in_executor(record_snapshot, watch, results, int(started))
+        except Exception as e:
+            logger.exception(f"Error running watchlist #{watch['id']}: {e}")
+            continue
+        finally:
+            mark_run(watch["id"], started)
+        logger.info(f"Watchlist #{watch['id']}: recorded {count} snapshots")
+        try:
+            await context.bot.send_message(
+                chat_id=watch["chat_id"],
+                text=f"👀 Watchlist #{watch['id']}: recorded {count} snapshots. /watch_export {watch['id']} for growth."
+            )
+        except Exception as e:
+            logger.error(f"Could not notify chat {watch['chat_id']}: {e}")
+
+async def toggle_trace(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    enabled = not context.user_data.get('trace_report', False)
+    context.user_data['trace_report'] = enabled
+    if enabled:
+        await update.message.reply_text("⏱️ Trace reports on: each job's timing summary is sent with its result.")
+    else:
+        await update.message.reply_text("⏱️ Trace reports off.")
+
+async def profile_next(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.effective_user.id not in ADMIN_USER_IDS:
+        await update.message.reply_text("❌ This command is for admins only.")
+        return
+    context.bot_data['profile_next'] = update.effective_chat.id
+    await update.message.reply_text("🔬 The next job will be profiled; the report will be sent here.")
+
+async def set_format(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    current = context.user_data.get('default_export_format', DEFAULT_EXPORT_FORMAT)
+    if not context.args or context.args[0].lower() not in EXPORT_FORMATS:
+        await update.message.reply_text(
+            f"Usage: /format <{'|'.join(EXPORT_FORMATS)}>\n\nCurrent default: {current}\n"
+            f"Use /start <format> to override it for a single job."
+        )
+        return
+    context.user_data['default_export_format'] = context.args[0].lower()
+    await update.message.reply_text(f"✅ Default output format set to {context.args[0].lower()}.")
+
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("❌ Cancelled. Use /start to begin again.")
     return ConversationHandler.END
@@ -366,12 +751,22 @@ def main():
         states={
             SELECT_PLATFORM: [CallbackQueryHandler(platform_selected)],
             SELECT_TIKTOK_MODE: [CallbackQueryHandler(tiktok_mode_selected)],
+            SELECT_YOUTUBE_MODE: [CallbackQueryHandler(youtube_mode_selected)],
+            SELECT_DOMAIN_MODE: [CallbackQueryHandler(domain_mode_selected)],
             GET_INPUT: [MessageHandler((filters.TEXT | filters.Document.ALL) & ~filters.COMMAND, input_received)]
         },
         fallbacks=[CommandHandler("cancel", cancel)],
         allow_reentry=True
     )
     app.add_handler(conv)
+    app.add_handler(CommandHandler("format", set_format))
+    app.add_handler(CommandHandler("trace", toggle_trace))
+    app.add_handler(CommandHandler("profile_next", profile_next))
+    app.add_handler(CommandHandler("watch", watch_add))
+    app.add_handler(CommandHandler("watches", watch_list))
+    app.add_handler(CommandHandler("unwatch", watch_remove))
+    app.add_handler(CommandHandler("watch_export", watch_export))
+    app.job_queue.run_repeating(run_due_watchlists, interval=WATCH_CHECK_INTERVAL, first=WATCH_CHECK_INTERVAL)
     logger.info("🤖 Bot is running...")
     app.run_polling(allowed_updates=None)
 
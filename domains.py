@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import sys
+import gzip
+from collections import Counter
+from functools import lru_cache
+from itertools import chain, compress, islice, repeat
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Tuple, TextIO
+
+# Registrable domain (eTLD+1) extraction against the bundled Public Suffix List.
+# The list is compiled once per process into a trie keyed by reversed labels; rule
+# ends are marked with "$", exception rules ("!www.ck") with "!". The trie is then
+# turned into one regex over reversed hosts, so a whole block of hosts is resolved by
+# a single findall instead of a Python loop per host.
+
+PSL_FILE = os.getenv("PSL_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "public_suffix_list.dat"))
+PSL_INCLUDE_PRIVATE = os.getenv("PSL_INCLUDE_PRIVATE", "0") == "1"
+
+DOMAIN_FIELDS = ["URL", "Domain"]
+AGGREGATE_FIELDS = ["Domain", "Count", "First Line"]
+
+_URL_PREFIX = r"(?:[A-Za-z][A-Za-z0-9+.\-]*://|//)?(?:[^@/?#\s]*@)?"
+_HOST = r"(\[[^\]/]*\]|[^:/?#\s]*)"
+_HOST_RE = re.compile(r"\s*" + _URL_PREFIX + _HOST)
+# Block form: exactly one host match per line, so findall over a block of lines parses
+# every line in a single C call. Same pattern as _HOST_RE, made possessive.
+_LINE_HOST_RE = re.compile(
+    r"^[ \t]*+(?:[A-Za-z][A-Za-z0-9+.\-]*+://|//)?+(?:[^@/?#\s]*+@)?+(\[[^\]/]*+\]|[^:/?#\s]*+)[^\n]*+", re.M
+)
+BLOCK_SIZE = 1 << 22
+
+_trie = None
+_suffix_re = None
+
+def _add_rule(trie: Dict, rule: str):
+    exception = rule.startswith("!")
+    labels = rule.lstrip("!").split(".")
+    node = trie
+    for label in reversed(labels):
+        node = node.setdefault(label, {})
+    node["!" if exception else "$"] = True
+
+def compile_suffix_trie(path: str = PSL_FILE, include_private: bool = PSL_INCLUDE_PRIVATE) -> Dict:
+    trie = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("// ===END ICANN DOMAINS===") and not include_private:
+                break
+            if not line or line.startswith("//"):
+                continue
+            rule = line.split()[0].lower()
+            _add_rule(trie, rule)
+            try:
+                ascii_rule = rule.encode("idna").decode("ascii")
+            except UnicodeError:
+                continue
+            if ascii_rule != rule:
+                _add_rule(trie, ascii_rule)
+    return trie
+
+# The regex reads a host reversed ("www.bbc.co.uk" -> "ku.oc.cbb.www"), so the trie is
+# walked from the start of the string. A label only matches whole, and a branch only
+# succeeds where a rule ends, so backtracking finds the longest matching rule.
+_LABEL_END = r"(?![^.\n])"
+
+def _alternation(entries: List[Tuple[str, str]]) -> str:
+    # entries: (reversed label, pattern that follows it). Labels are factored into a
+    # character trie so each regex branch point has few alternatives.
+    if len(entries) == 1:
+        return re.escape(entries[0][0]) + entries[0][1]
+    groups = {}
+    ends = []
+    for literal, tail in entries:
+        if literal:
+            groups.setdefault(literal[0], []).append((literal[1:], tail))
+        else:
+            ends.append(tail)
+    branches = [re.escape(ch) + _alternation(sub) for ch, sub in groups.items()] + ends
+    return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+def _node_pattern(node: Dict) -> str:
+    # What may follow a matched suffix node: a deeper rule, the wildcard (minus its
+    # exceptions), or, when followed by an exception label, stopping at this node.
+    exceptions = [label for label, child in node.items() if isinstance(child, dict) and "!" in child]
+    children = [(label[::-1], _LABEL_END + _node_pattern(child)) for label, child in node.items()
+                if label not in ("$", "!", "*") and "!" not in child]
+    deeper = []
+    if children:
+        deeper.append(_alternation(children))
+    if "*" in node:
+        excluded = "".join(f"(?!{re.escape(label[::-1])}{_LABEL_END})" for label in exceptions)
+        # Any label; an empty one only between dots, as the trie walk never visits a leading one.
+        deeper.append(excluded + r"(?:[^.\n]+|(?=\.))" + _node_pattern(node["*"]))
+    branches = []
+    if deeper:
+        branches.append(r"\." + (deeper[0] if len(deeper) == 1 else "(?:" + "|".join(deeper) + ")"))
+    branches += [r"(?=\." + re.escape(label[::-1]) + _LABEL_END + ")" for label in exceptions]
+    if not branches:
+        return ""
+    if "$" in node:
+        return "(?:" + "|".join(branches) + ")?"
+    return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+def compile_suffix_regex(trie: Dict):
+    # One match per line of reversed hosts; the group is the reversed registrable domain.
+    # IPs and bracketed IPv6 hosts are kept whole; an unlisted TLD counts as a suffix.
+    tlds = [(label[::-1], _LABEL_END + _node_pattern(child)) for label, child in trie.items()
+            if label not in ("$", "!", "*") and "!" not in child]
+    suffix = "(?:" + _alternation(tlds) + r"|[^.\n]+)"
+    literal = r"\d{1,3}(?:\.\d{1,3}){3}(?![^\n])|\][^\n]*"
+    return re.compile(r"^\.*((?:" + literal + "|" + suffix + r"(?:\.[^.\n]*)?)?)[^\n]*", re.M)
+
+def _get_suffix_re():
+    global _trie, _suffix_re
+    if _suffix_re is None:
+        _trie = compile_suffix_trie()
+        _suffix_re = compile_suffix_regex(_trie)
+    return _suffix_re
+
+def extract_host(url: str) -> str:
+    match = _HOST_RE.match(url)
+    if not match:
+        return ""
+    return match.group(1).lower().rstrip(".")
+
+def registrable_domains(hosts: Iterable[str]) -> List[str]:
+    # Resolves hosts in order. Lowercasing, reversing and matching run over the joined
+    # block, so per-host work stays in C.
+    hosts = hosts if isinstance(hosts, list) else list(hosts)
+    text = "\n".join(hosts).lower()[::-1]
+    found = _get_suffix_re().findall(text)
+    if len(found) > len(hosts):
+        # A leading empty host leaves a trailing newline, which findall sees as one more line.
+        found.pop()
+    return "\n".join(found)[::-1].split("\n") if hosts else []
+
+@lru_cache(maxsize=65536)
+def registrable_domain(host: str) -> str:
+    return registrable_domains([host])[0]
+
+def extract_domain_fast(url: str) -> str:
+    return registrable_domain(extract_host(url))
+
+def _iter_blocks(lines) -> Iterator[str]:
+    # Text streams are read in BLOCK_SIZE pieces cut at line ends; lists (Excel columns,
+    # message text) are joined in batches. Either way line numbering is preserved.
+    if hasattr(lines, "read"):
+        while True:
+            block = lines.read(BLOCK_SIZE)
+            if not block:
+                return
+            if not block.endswith("\n"):
+                block += lines.readline()
+            yield block
+    else:
+        it = iter(lines)
+        while True:
+            batch = list(islice(it, 65536))
+            if not batch:
+                return
+            yield "\n".join(line.rstrip("\r\n") for line in batch) + "\n"
+
+def _iter_parsed_blocks(lines) -> Iterator[Tuple[List[str], List[str], bool]]:
+    # Yields (urls, domains, needs_quoting) per block: one url (the line without leading
+    # spaces/tabs, trailing whitespace or anything after a stray \r) and one domain per
+    # input line, blank lines having an empty url.
+    for block in _iter_blocks(lines):
+        hosts = _LINE_HOST_RE.findall(block)
+        urls = block.split("\n")
+        if block.endswith("\n"):
+            # The piece after the final newline is not a line.
+            hosts.pop()
+            urls.pop()
+        if "\r" in block.replace("\r\n", ""):
+            urls = [url.split("\r", 1)[0] for url in urls]
+        urls = list(map(str.rstrip, map(str.lstrip, urls, repeat(" \t"))))
+        yield urls, registrable_domains(hosts), '"' in block or "," in block
+
+def iter_domain_rows(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    for urls, domains, _ in _iter_parsed_blocks(lines):
+        yield from compress(zip(urls, domains), urls)
+
+def _csv_field(value: str) -> str:
+    if '"' in value or "," in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def _format_rows(row_format: str, columns: List[Iterable]) -> str:
+    # CSV text for equally long columns: the cells are interleaved into one tuple and
+    # formatted with a repeated row template in a single call.
+    width = len(columns)
+    rows = len(columns[0])
+    cells = [None] * (width * rows)
+    for i, column in enumerate(columns):
+        cells[i::width] = column
+    return (row_format * rows) % tuple(cells)
+
+def write_domains_csv(lines: Iterable[str], out: TextIO) -> int:
+    # Same output as csv.writer (\r\n line ends, minimal quoting), formatted a block at a time.
+    out.write(",".join(DOMAIN_FIELDS) + "\r\n")
+    count = 0
+    for urls, domains, needs_quoting in _iter_parsed_blocks(lines):
+        if "" in urls:
+            domains = list(compress(domains, urls))
+            urls = list(compress(urls, urls))
+        if needs_quoting:
+            urls = list(map(_csv_field, urls))
+            domains = list(map(_csv_field, domains))
+        count += len(urls)
+        out.write(_format_rows("%s,%s\r\n", [urls, domains]))
+    return count
+
+def _aggregate(lines) -> Tuple[Dict[str, int], List[int], bool]:
+    # counts keeps first-seen order, so the first line numbers are collected in a list
+    # alongside it. Memory grows with distinct domains only.
+    counts = Counter()
+    firsts = []
+    quoted = False
+    line_no = 0
+    for urls, domains, needs_quoting in _iter_parsed_blocks(lines):
+        numbers = range(line_no + 1, line_no + len(urls) + 1)
+        line_no += len(urls)
+        quoted = quoted or needs_quoting
+        if "" in urls:
+            domains = list(compress(domains, urls))
+            numbers = list(compress(numbers, urls))
+        known = len(counts)
+        counts.update(domains)
+        added = len(counts) - known
+        if added == len(domains):
+            # Every domain in the block is new and occurs once.
+            firsts.extend(numbers)
+        elif added:
+            # Built back to front, so each domain keeps its first line in this block.
+            block_first = dict(zip(reversed(domains), reversed(numbers)))
+            new = list(islice(reversed(counts), added))
+            firsts.extend(map(block_first.__getitem__, reversed(new)))
+    return counts, firsts, quoted
+
+def aggregate_domains(lines: Iterable[str]) -> Tuple[Dict[str, int], Dict[str, int]]:
+    # (domain -> count, domain -> first line number)
+    counts, firsts, _ = _aggregate(lines)
+    return counts, dict(zip(counts, firsts))
+
+def write_aggregate_csv(lines: Iterable[str], out: TextIO) -> Tuple[int, int]:
+    counts, firsts, quoted = _aggregate(lines)
+    out.write(",".join(AGGREGATE_FIELDS) + "\r\n")
+    names = map(_csv_field, counts) if quoted else counts
+    # Most frequent first; rows are in first-seen order and the sort is stable, so ties
+    # keep input order.
+    rows = sorted(zip(names, counts.values(), firsts), key=itemgetter(1), reverse=True)
+    if rows:
+        out.write(("%s,%d,%d\r\n" * len(rows)) % tuple(chain.from_iterable(rows)))
+    return sum(counts.values()), len(counts)
+
+def open_text(path: str, mode: str = "r") -> TextIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", errors="replace", newline="")
+    return open(path, mode, encoding="utf-8", errors="replace", newline="")
+
+if __name__ == "__main__":
+    # python domains.py [--aggregate] <input.txt[.gz]> <output.csv[.gz]>
+    args = sys.argv[1:]
+    aggregate = "--aggregate" in args
+    args = [a for a in args if a != "--aggregate"]
+    if len(args) != 2:
+        print("Usage: python domains.py [--aggregate] <input.txt[.gz]> <output.csv[.gz]>")
+        sys.exit(1)
+    with open_text(args[0]) as src, open_text(args[1], "w") as dst:
+        if aggregate:
+            total, distinct = write_aggregate_csv(src, dst)
+            print(f"✓ {total} URLs, {distinct} domains")
+        else:
+            print(f"✓ {write_domains_csv(src, dst)} URLs")
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import csv
+import json
+import gzip
+import shutil
+from typing import Dict, Iterable, List, Optional
+
+import openpyxl
+
+# Result exporters. Every format writes straight from the row iterable to disk, one
+# row at a time (Parquet: one row group per PARQUET_BATCH_SIZE rows), with columns in
+# the template's column order from fields_mapping.
+
+EXPORT_FORMATS = {
+    "xlsx": ".xlsx",
+    "csv": ".csv",
+    "csv.gz": ".csv.gz",
+    "jsonl": ".jsonl",
+    "jsonl.gz": ".jsonl.gz",
+    "parquet": ".parquet",
+}
+DEFAULT_EXPORT_FORMAT = os.getenv("DEFAULT_EXPORT_FORMAT", "xlsx")
+TELEGRAM_UPLOAD_LIMIT = 50 * 1024 * 1024
+PARQUET_BATCH_SIZE = 10000
+# Stored as nullable int64 in Parquet; "N/A"/"Error" and other non-numeric values become null.
+COUNTER_FIELDS = {"views", "likes", "comments", "subscribers", "channel_subs"}
+
+def _column_key(col: str):
+    return (len(col), col)
+
+def ordered_fields(mapping: Dict[str, str]) -> List[str]:
+    return [field for field, col in sorted(mapping.items(), key=lambda kv: _column_key(kv[1]))]
+
+def _open_output(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+def write_csv(rows: Iterable[Dict], fields: List[str], path: str) -> int:
+    count = 0
+    with _open_output(path) as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow([row.get(field, "N/A") for field in fields])
+            count += 1
+    return count
+
+def write_jsonl(rows: Iterable[Dict], fields: List[str], path: str) -> int:
+    count = 0
+    with _open_output(path) as f:
+        for row in rows:
+            f.write(json.dumps({field: row.get(field, "N/A") for field in fields}, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+def _text_value(val) -> Optional[str]:
+    return None if val is None else str(val)
+
+def parse_counter(val) -> Optional[int]:
+    # Shared by exports and watchlist snapshots: ints and digit strings with "," grouping
+    # parse; "N/A", "Error" and fractional values such as "1.5" give None.
+    if isinstance(val, bool) or val is None:
+        return None
+    if isinstance(val, int):
+        return val
+    if isinstance(val, float):
+        return int(val) if val.is_integer() else None
+    digits = re.sub(r"[\s,]", "", str(val))
+    return int(digits) if digits.isdigit() else None
+
+def write_parquet(rows: Iterable[Dict], fields: List[str], path: str) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet export requires pyarrow (pip install pyarrow)")
+    # Counters are typed; other columns mix numbers with "N/A"/"Error" markers, so they stay strings.
+    schema = pa.schema([(field, pa.int64() if field in COUNTER_FIELDS else pa.string()) for field in fields])
+    converters = [(field, parse_counter if field in COUNTER_FIELDS else _text_value) for field in fields]
+    count = 0
+    batch = {field: [] for field in fields}
+
+    def flush(writer):
+        writer.write_table(pa.table(batch, schema=schema))
+        for values in batch.values():
+            values.clear()
+
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for row in rows:
+            for field, convert in converters:
+                batch[field].append(convert(row.get(field, "N/A")))
+            count += 1
+            if count % PARQUET_BATCH_SIZE == 0:
+                flush(writer)
+        if count % PARQUET_BATCH_SIZE or not count:
+            flush(writer)
+    return count
+
+def write_xlsx(rows: Iterable[Dict], mapping: Dict[str, str], path: str, template_path: str) -> int:
+    wb = openpyxl.load_workbook(template_path)
+    ws = wb.active
+    count = 0
+    start_row = 2
+    for i, row_data in enumerate(rows, start=start_row):
+        for field, col in mapping.items():
+            val = row_data.get(field, "N/A")
+            ws[f"{col}{i}"].value = val
+        count += 1
+    wb.save(path)
+    return count
+
+def export_rows(rows: Iterable[Dict], mapping: Dict[str, str], fmt: str, path: str,
+                template_path: Optional[str] = None) -> int:
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "xlsx":
+        return write_xlsx(rows, mapping, path, template_path)
+    fields = ordered_fields(mapping)
+    if fmt.startswith("csv"):
+        return write_csv(rows, fields, path)
+    if fmt.startswith("jsonl"):
+        return write_jsonl(rows, fields, path)
+    return write_parquet(rows, fields, path)
+
+def compress_if_too_large(path: str, limit: int = TELEGRAM_UPLOAD_LIMIT) -> str:
+    # Plain CSV/JSONL over the upload limit get gzipped after the fact.
+    if path.endswith((".csv", ".jsonl")) and os.path.getsize(path) > limit:
+        with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(path)
+        return path + ".gz"
+    return path
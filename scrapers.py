@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
+import os
 import re
+import json
 import asyncio
 import aiohttp
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+from tracing import span, redact_url
 
 # YouTube Scraper
 YOUTUBE_API_KEYS = [
@@ -52,10 +55,11 @@ async def fetch_youtube_videos(video_ids):
     url = f"https://www.googleapis.com/youtube/v3/videos?part=snippet,statistics,contentDetails&id={ids_str}&key={api_key}"
 
     async with aiohttp.ClientSession() as session:
-        async with session.get(url) as resp:
-            if resp.status != 200:
-                return None
-            return await resp.json()
+        with span("http", redact_url(url)):
+            async with session.get(url) as resp:
+                if resp.status != 200:
+                    return None
+                return await resp.json()
 
 async def fetch_youtube_channels(channel_ids):
     api_key = _rotate_youtube_key()
@@ -63,10 +67,11 @@ async def fetch_youtube_channels(channel_ids):
     url = f"https://www.googleapis.com/youtube/v3/channels?part=snippet,statistics&id={ids_str}&key={api_key}"
 
     async with aiohttp.ClientSession() as session:
-        async with session.get(url) as resp:
-            if resp.status != 200:
-                return None
-            return await resp.json()
+        with span("http", redact_url(url)):
+            async with session.get(url) as resp:
+                if resp.status != 200:
+                    return None
+                return await resp.json()
 
 async def youtube_scraper(urls):
     video_ids = []
@@ -75,19 +80,25 @@ async def youtube_scraper(urls):
         if vid and vid not in video_ids:
             video_ids.append(vid)
 
+    return await youtube_videos_by_ids(video_ids)
+
+async def youtube_videos_by_ids(video_ids: List[str]) -> List[Dict]:
     if not video_ids:
         return []
 
     results = []
+    channel_map = {}
     CHUNK_SIZE = 50
     for i in range(0, len(video_ids), CHUNK_SIZE):
         chunk = video_ids[i:i+CHUNK_SIZE]
         video_data = await fetch_youtube_videos(chunk)
         if not video_data or "items" not in video_data:
             continue
-        channel_ids = [v["snippet"]["channelId"] for v in video_data["items"]]
-        channel_data = await fetch_youtube_channels(channel_ids)
-        channel_map = {}
+        # Channels already looked up for an earlier chunk are not fetched again.
+        channel_ids = list(dict.fromkeys(
+            v["snippet"]["channelId"] for v in video_data["items"] if v["snippet"]["channelId"] not in channel_map
+        ))
+        channel_data = await fetch_youtube_channels(channel_ids) if channel_ids else None
         if channel_data and "items" in channel_data:
             for ch in channel_data["items"]:
                 channel_map[ch["id"]] = {
@@ -95,26 +106,124 @@ async def youtube_scraper(urls):
                     "subs": ch["statistics"].get("subscriberCount", "0"),
                     "username": "@" + ch["snippet"].get("customUrl", "").lstrip("@")
                 }
-        for video in video_data["items"]:
-            channel_id = video["snippet"]["channelId"]
-            details = video.get("contentDetails", {})
-            duration_fmt = format_duration_ISO8601(details.get("duration", "")) if "duration" in details else "00:00:00"
-            stats = video.get("statistics", {})
-            results.append({
-                "source_url": f"https://www.youtube.com/watch?v={video['id']}",
-                "title": video["snippet"].get("title", ""),
-                "videoId": video["id"],
-                "views": stats.get("viewCount", "0"),
-                "duration": duration_fmt,
-                "channelId": channel_id,
-                "channel_name": channel_map.get(channel_id, {}).get("name", ""),
-                "channel_subs": channel_map.get(channel_id, {}).get("subs", "0"),
-                "likes": stats.get("likeCount", "0"),
-                "publish_date": video["snippet"].get("publishedAt", "").split("T")[0],
-                "channel_username": channel_map.get(channel_id, {}).get("username", ""),
-            })
+        with span("parsing", "youtube videos"):
+            for video in video_data["items"]:
+                channel_id = video["snippet"]["channelId"]
+                details = video.get("contentDetails", {})
+                duration_fmt = format_duration_ISO8601(details.get("duration", "")) if "duration" in details else "00:00:00"
+                stats = video.get("statistics", {})
+                results.append({
+                    "source_url": f"https://www.youtube.com/watch?v={video['id']}",
+                    "title": video["snippet"].get("title", ""),
+                    "videoId": video["id"],
+                    "views": stats.get("viewCount", "0"),
+                    "duration": duration_fmt,
+                    "channelId": channel_id,
+                    "channel_name": channel_map.get(channel_id, {}).get("name", ""),
+                    "channel_subs": channel_map.get(channel_id, {}).get("subs", "0"),
+                    "likes": stats.get("likeCount", "0"),
+                    "publish_date": video["snippet"].get("publishedAt", "").split("T")[0],
+                    "channel_username": channel_map.get(channel_id, {}).get("username", ""),
+                })
     return results
 
+YOUTUBE_API = "https://www.googleapis.com/youtube/v3/"
+YOUTUBE_CHANNEL_CONCURRENCY = 5
+
+def extract_youtube_channel_ref(value: str):
+    value = value.strip()
+    match = re.search(r"youtube\.com/channel/(UC[a-zA-Z0-9_-]{22})", value)
+    if match or re.match(r"^UC[a-zA-Z0-9_-]{22}$", value):
+        return ("id", match.group(1) if match else value)
+    match = re.search(r"youtube\.com/(@[\w.\-]+)", value)
+    if match or value.startswith("@"):
+        return ("handle", match.group(1) if match else value.split("/")[0])
+    match = re.search(r"youtube\.com/user/([\w.\-]+)", value)
+    if match:
+        return ("username", match.group(1))
+    # Legacy /c/ custom URLs are not accepted: their name need not match any handle or
+    # username, and guessing could crawl a different channel.
+    return None
+
+async def resolve_youtube_uploads_playlist(session: aiohttp.ClientSession, ref) -> str:
+    kind, value = ref
+    if kind == "id":
+        # The uploads playlist id is derived from the channel id; no API call needed.
+        return "UU" + value[2:]
+    param = f"forHandle={value}" if kind == "handle" else f"forUsername={value}"
+    url = f"{YOUTUBE_API}channels?part=contentDetails&{param}&key={_rotate_youtube_key()}"
+    try:
+        with span("http", redact_url(url)):
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+                if resp.status != 200:
+                    return ""
+                data = await resp.json()
+        items = data.get("items") or []
+        if not items:
+            return ""
+        return items[0]["contentDetails"]["relatedPlaylists"]["uploads"]
+    except Exception as e:
+        print(f"Error resolving YouTube channel {value}: {str(e)}")
+        return ""
+
+async def fetch_playlist_video_ids(session: aiohttp.ClientSession, playlist_id: str) -> Tuple[List[str], bool]:
+    # Returns (video_ids, complete); complete is False when paging stopped on an error.
+    video_ids = []
+    page_token = ""
+    page = 1
+    while True:
+        url = (f"{YOUTUBE_API}playlistItems?part=contentDetails&maxResults=50&playlistId={playlist_id}"
+               f"&fields=nextPageToken,items/contentDetails/videoId&key={_rotate_youtube_key()}")
+        if page_token:
+            url += f"&pageToken={page_token}"
+        try:
+            with span("http", redact_url(url)):
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+                    if resp.status != 200:
+                        print(f"   ⚠️ HTTP {resp.status} on page {page} of {playlist_id}")
+                        return video_ids, False
+                    data = await resp.json()
+        except Exception as e:
+            print(f"   ⚠️ Error fetching page {page} of {playlist_id}: {str(e)}")
+            return video_ids, False
+        video_ids.extend(item["contentDetails"]["videoId"] for item in data.get("items", []))
+        page_token = data.get("nextPageToken")
+        if not page_token:
+            return video_ids, True
+        page += 1
+
+async def youtube_channel_scraper(channel_urls: List[str], incomplete: Optional[List[str]] = None) -> List[Dict]:
+    # Channels whose upload list was only partly fetched are appended to incomplete.
+    refs = []
+    for value in channel_urls:
+        ref = extract_youtube_channel_ref(value)
+        if ref is None:
+            print(f"❌ Unsupported YouTube channel reference: {value}")
+        elif ref not in refs:
+            refs.append(ref)
+
+    semaphore = asyncio.Semaphore(YOUTUBE_CHANNEL_CONCURRENCY)
+
+    async def channel_video_ids(session, ref):
+        async with semaphore:
+            playlist_id = await resolve_youtube_uploads_playlist(session, ref)
+            if not playlist_id:
+                print(f"❌ Could not resolve YouTube channel {ref[1]}")
+                return []
+            ids, complete = await fetch_playlist_video_ids(session, playlist_id)
+            if complete:
+                print(f"✓ Total videos listed from {ref[1]}: {len(ids)}")
+            else:
+                print(f"⚠️ Only partly listed {ref[1]}: {len(ids)} videos before the error")
+                if incomplete is not None:
+                    incomplete.append(ref[1])
+            return ids
+
+    async with aiohttp.ClientSession() as session:
+        per_channel = await asyncio.gather(*(channel_video_ids(session, ref) for ref in refs))
+    video_ids = list(dict.fromkeys(vid for ids in per_channel for vid in ids))
+    return await youtube_videos_by_ids(video_ids)
+
 # TikTok Scraper with Two Modes
 TIKWM_API = 'https://www.tikwm.com/api/'
 
@@ -131,10 +240,11 @@ def format_date_tiktok(ts_ms):
 async def get_user_stats(session: aiohttp.ClientSession, username: str) -> int:
     try:
         api_url = f"{TIKWM_API}user/info?unique_id={username}"
-        async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=15)) as resp:
-            if resp.status != 200:
-                return 0
-            data = await resp.json()
+        with span("http", api_url):
+            async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=15)) as resp:
+                if resp.status != 200:
+                    return 0
+                data = await resp.json()
             if data.get("data") and data["data"].get("user"):
                 user_data = data["data"]["user"]
                 followers = user_data.get("followerCount", 0)
@@ -144,27 +254,67 @@ async def get_user_stats(session: aiohttp.ClientSession, username: str) -> int:
         return 0
 
 async def get_channel_videos(session: aiohttp.ClientSession, username: str, max_cursor: int = 0) -> Dict:
+    # A failed request comes back with "error" set, so callers can tell it from the last page.
     try:
         api_url = f"{TIKWM_API}user/posts?unique_id={username}&count=35&cursor={max_cursor}"
-        async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
-            if resp.status != 200:
-                return {"videos": [], "has_more": False, "cursor": 0}
-            data = await resp.json()
+        with span("http", api_url):
+            async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+                if resp.status != 200:
+                    return {"videos": [], "has_more": False, "cursor": 0, "error": f"HTTP {resp.status}"}
+                data = await resp.json()
             if not data.get("data") or "videos" not in data["data"]:
-                return {"videos": [], "has_more": False, "cursor": 0}
+                return {"videos": [], "has_more": False, "cursor": 0, "error": data.get("msg") or "no data"}
             videos = data["data"].get("videos", [])
             has_more = data["data"].get("hasMore", False)
             cursor = data["data"].get("cursor", 0)
             return {"videos": videos, "has_more": has_more, "cursor": cursor}
     except Exception as e:
         print(f"Error fetching videos: {str(e)}")
-        return {"videos": [], "has_more": False, "cursor": 0}
+        return {"videos": [], "has_more": False, "cursor": 0, "error": str(e)}
+
+TIKTOK_CHANNEL_STATE_FILE = os.getenv("TIKTOK_CHANNEL_STATE_FILE", "tiktok_channel_state.json")
+# Serializes reads and read-merge-writes of the state file between concurrent delta jobs.
+_channel_state_lock = asyncio.Lock()
 
-async def extract_all_channel_videos(session: aiohttp.ClientSession, username: str) -> List[Dict]:
+def channel_state_key(username: str, scope=None) -> str:
+    # Delta boundaries are per chat: one chat's crawl must not hide new posts from another.
+    return f"{scope}:{username.lower()}" if scope is not None else username.lower()
+
+def load_channel_state(path: str = TIKTOK_CHANNEL_STATE_FILE) -> Dict:
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Could not read channel state {path}: {str(e)}")
+        return {}
+
+def save_channel_state(state: Dict, path: str = TIKTOK_CHANNEL_STATE_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+async def extract_all_channel_videos(session: aiohttp.ClientSession, username: str,
+                                     state: Dict = None, refresh_recent: int = 0, scope=None) -> List[Dict]:
+    # Delta mode: when state holds the newest post from a previous crawl, paging stops once
+    # already-seen posts are reached; refresh_recent keeps the newest K seen posts so their
+    # metrics are refreshed too. state is updated in place with the newest post found, but
+    # only when the crawl finished: after a failed page the posts between the failure and
+    # the old boundary were never fetched, so the boundary must not move past them.
+    state_key = channel_state_key(username, scope)
+    last_seen = state.get(state_key) if state is not None else None
     all_videos = []
     cursor = 0
     page = 1
-    print(f"📺 Extracting videos from @{username}")
+    seen_kept = 0
+    newest = None
+    finished = False
+    last_create_time = last_seen.get("create_time", 0) if last_seen else 0
+    last_video_id = last_seen.get("video_id", "") if last_seen else ""
+    mode = "delta" if last_seen else "full"
+    print(f"📺 Extracting videos from @{username} ({mode})")
     followers = await get_user_stats(session, username)
     
     while True:
@@ -172,15 +322,32 @@ async def extract_all_channel_videos(session: aiohttp.ClientSession, username: s
         result = await get_channel_videos(session, username, cursor)
         videos = result["videos"]
         
+        if result.get("error"):
+            print(f"Failed: {result['error']}")
+            break
         if not videos:
             print("No more videos")
+            finished = True
             break
         
         print(f"Found {len(videos)} videos")
         
+        reached_seen = False
         for video in videos:
             try:
                 video_id = video.get("video_id", "")
+                create_time = video.get("create_time", 0)
+                pinned = bool(video.get("is_top", 0))
+                if not pinned and (newest is None or create_time > newest["create_time"]):
+                    newest = {"video_id": video_id, "create_time": create_time}
+                if last_seen and (video_id == last_video_id or create_time <= last_create_time):
+                    if pinned:
+                        # Pinned posts sit at the top regardless of age; they don't mark the boundary.
+                        continue
+                    reached_seen = True
+                    if seen_kept >= refresh_recent:
+                        break
+                    seen_kept += 1
                 video_url = f"https://www.tiktok.com/@{username}/video/{video_id}"
                 video_data = {
                     "source_url": video_url,
@@ -189,7 +356,7 @@ async def extract_all_channel_videos(session: aiohttp.ClientSession, username: s
                     "duration": format_duration_tiktok(video.get("duration", 0)),
                     "likes": video.get("digg_count", 0),
                     "comments": video.get("comment_count", 0),
-                    "upload_date": format_date_tiktok(video.get("create_time", 0)),
+                    "upload_date": format_date_tiktok(create_time),
                     "profile_url": f"https://www.tiktok.com/@{username}",
                     "author_name": video.get("author", {}).get("nickname", username),
                     "subscribers": followers,
@@ -200,12 +367,22 @@ async def extract_all_channel_videos(session: aiohttp.ClientSession, username: s
                 print(f"   ⚠️ Error processing video: {str(e)}")
                 continue
         
+        if reached_seen and seen_kept >= refresh_recent:
+            print("   Reached already-seen posts")
+            finished = True
+            break
         if not result["has_more"]:
+            finished = True
             break
         cursor = result["cursor"]
         page += 1
-        await asyncio.sleep(2)
+        with span("rate_limit", f"channel page @{username}"):
+            await asyncio.sleep(2)
     
+    if not finished:
+        print(f"   ⚠️ Crawl of @{username} stopped early; delta boundary not moved")
+    elif state is not None and newest and newest["create_time"] >= last_create_time:
+        state[state_key] = newest
     print(f"✓ Total videos extracted from @{username}: {len(all_videos)}")
     return all_videos
 
@@ -215,43 +392,45 @@ async def scrape_single_tiktok_url(session: aiohttp.ClientSession, url: str, ind
         api_url = f"{TIKWM_API}?url={url}"
         print(f"[{index}/{total}] ⏳ Scraping: {url}")
         
-        async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
-            if resp.status != 200:
-                print(f"[{index}/{total}] ❌ HTTP {resp.status} for {url}")
-                return create_tiktok_error_entry(url, f"HTTP {resp.status}")
-            
-            data = await resp.json()
-            if "data" not in data or not data.get("data"):
-                error_msg = data.get("msg", "No data found")
-                print(f"[{index}/{total}] ❌ {error_msg}: {url}")
-                return create_tiktok_error_entry(url, error_msg)
-            
-            d = data["data"]
-            author = d.get("author", {})
-            username = author.get("unique_id", "")
-            
-            followers = 0
-            if username:
-                print(f"[{index}/{total}] 📊 Fetching follower count for @{username}...")
-                followers = await get_user_stats(session, username)
-            
-            result = {
-                "source_url": url,
-                "title": d.get("title", "N/A"),
-                "views": d.get("play_count", 0),
-                "duration": format_duration_tiktok(d.get("duration", 0)),
-                "likes": d.get("digg_count", 0),
-                "comments": d.get("comment_count", 0),
-                "upload_date": format_date_tiktok(d.get("create_time", 0)),
-                "profile_url": f"https://www.tiktok.com/@{username}" if username else "N/A",
-                "author_name": author.get("nickname", "N/A"),
-                "subscribers": followers,
-                "channel_username": username if username else "N/A"
-            }
-            
-            print(f"[{index}/{total}] ✓ Success: {result['title'][:40]}... (Followers: {followers:,})")
+        with span("http", api_url):
+            async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+                if resp.status != 200:
+                    print(f"[{index}/{total}] ❌ HTTP {resp.status} for {url}")
+                    return create_tiktok_error_entry(url, f"HTTP {resp.status}")
+                data = await resp.json()
+        
+        if "data" not in data or not data.get("data"):
+            error_msg = data.get("msg", "No data found")
+            print(f"[{index}/{total}] ❌ {error_msg}: {url}")
+            return create_tiktok_error_entry(url, error_msg)
+        
+        d = data["data"]
+        author = d.get("author", {})
+        username = author.get("unique_id", "")
+        
+        followers = 0
+        if username:
+            print(f"[{index}/{total}] 📊 Fetching follower count for @{username}...")
+            followers = await get_user_stats(session, username)
+        
+        result = {
+            "source_url": url,
+            "title": d.get("title", "N/A"),
+            "views": d.get("play_count", 0),
+            "duration": format_duration_tiktok(d.get("duration", 0)),
+            "likes": d.get("digg_count", 0),
+            "comments": d.get("comment_count", 0),
+            "upload_date": format_date_tiktok(d.get("create_time", 0)),
+            "profile_url": f"https://www.tiktok.com/@{username}" if username else "N/A",
+            "author_name": author.get("nickname", "N/A"),
+            "subscribers": followers,
+            "channel_username": username if username else "N/A"
+        }
+        
+        print(f"[{index}/{total}] ✓ Success: {result['title'][:40]}... (Followers: {followers:,})")
+        with span("rate_limit", "tikwm post"):
             await asyncio.sleep(1.5)
-            return result
+        return result
     except asyncio.TimeoutError:
         print(f"[{index}/{total}] ❌ Timeout: {url}")
         return create_tiktok_error_entry(url, "Timeout")
@@ -275,7 +454,8 @@ async def tiktok_post_details_scraper(urls: List[str]) -> List[Dict]:
             results.append(result)
     return results
 
-async def tiktok_channel_posts_scraper(profile_urls: List[str]) -> List[Dict]:
+async def tiktok_channel_posts_scraper(profile_urls: List[str], delta: bool = False, refresh_recent: int = 0,
+                                       scope=None) -> List[Dict]:
     all_results = []
     usernames = []
     for profile in profile_urls:
@@ -286,11 +466,23 @@ async def tiktok_channel_posts_scraper(profile_urls: List[str]) -> List[Dict]:
                 username = profile.lstrip('@')
             usernames.append(username)
     
+    state = None
+    if delta:
+        async with _channel_state_lock:
+            state = load_channel_state()
     async with aiohttp.ClientSession() as session:
         for username in usernames:
             if username:
-                videos = await extract_all_channel_videos(session, username)
+                videos = await extract_all_channel_videos(session, username, state, refresh_recent, scope)
                 all_results.extend(videos)
+    if delta:
+        # Other jobs may have saved while this one crawled: reload and keep the newer boundary per key.
+        async with _channel_state_lock:
+            current = load_channel_state()
+            for key, newest in state.items():
+                if key not in current or newest.get("create_time", 0) >= current[key].get("create_time", 0):
+                    current[key] = newest
+            save_channel_state(current)
     return all_results
 
 # Dailymotion Scraper
@@ -303,15 +495,16 @@ async def dailymotion_scraper(urls):
             try:
                 video_id = re.sub(r'https://www\.dailymotion\.com/video/', '', url)
                 video_url = api_base + video_id + '?fields=id,title,created_time,duration,views_total,likes_total,owner'
-                async with session.get(video_url) as resp:
-                    if resp.status != 200:
-                        results.append({
-                            "source_url": url, "title": "N/A", "upload_date": "N/A", "duration": "00:00:00",
-                            "views": "N/A", "likes": "N/A", "channel_name": "N/A", "channel_url": "N/A",
-                            "subscribers": "N/A", "channel_username": "N/A"
-                        })
-                        continue
-                    video_data = await resp.json()
+                with span("http", video_url):
+                    async with session.get(video_url) as resp:
+                        if resp.status != 200:
+                            results.append({
+                                "source_url": url, "title": "N/A", "upload_date": "N/A", "duration": "00:00:00",
+                                "views": "N/A", "likes": "N/A", "channel_name": "N/A", "channel_url": "N/A",
+                                "subscribers": "N/A", "channel_username": "N/A"
+                            })
+                            continue
+                        video_data = await resp.json()
 
                 created_time = video_data.get("created_time", None)
                 upload_date = datetime.utcfromtimestamp(created_time).strftime('%Y-%m-%d') if created_time else "N/A"
@@ -321,11 +514,12 @@ async def dailymotion_scraper(urls):
                 channel_url = "N/A"
                 if owner_id:
                     user_api = f'https://api.dailymotion.com/user/{owner_id}?fields=username,url'
-                    async with session.get(user_api) as owner_resp:
-                        if owner_resp.status == 200:
-                            owner_data = await owner_resp.json()
-                            channel_name = owner_data.get("username", "N/A")
-                            channel_url = owner_data.get("url", "N/A")
+                    with span("http", user_api):
+                        async with session.get(user_api) as owner_resp:
+                            if owner_resp.status == 200:
+                                owner_data = await owner_resp.json()
+                                channel_name = owner_data.get("username", "N/A")
+                                channel_url = owner_data.get("url", "N/A")
 
                 duration_sec = video_data.get("duration", 0)
                 hours = int(duration_sec // 3600)
@@ -355,16 +549,18 @@ async def okru_scraper(urls):
     async with aiohttp.ClientSession() as session:
         for url in urls:
             try:
-                async with session.get(url) as resp:
-                    if resp.status != 200:
-                        results.append({
-                            "source_url": url, "title": "N/A", "duration": "00:00:00", "views": "N/A",
-                            "channel_url": "N/A", "channel_name": "N/A", "subscribers": "N/A",
-                            "upload_date": "N/A", "likes": "N/A", "channel_username": "N/A"
-                        })
-                        continue
-                    text = await resp.text()
-
+                with span("http", url):
+                    async with session.get(url) as resp:
+                        if resp.status != 200:
+                            results.append({
+                                "source_url": url, "title": "N/A", "duration": "00:00:00", "views": "N/A",
+                                "channel_url": "N/A", "channel_name": "N/A", "subscribers": "N/A",
+                                "upload_date": "N/A", "likes": "N/A", "channel_username": "N/A"
+                            })
+                            continue
+                        text = await resp.text()
+
+                with span("parsing", "ok.ru page"):
                     def re_search(pattern):
                         m = re.search(pattern, text, re.IGNORECASE)
                         return m.group(1) if m else "N/A"
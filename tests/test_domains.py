@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import io
+
+import pytest
+
+from domains import (
+    extract_host, registrable_domain, extract_domain_fast,
+    write_domains_csv, write_aggregate_csv, aggregate_domains
+)
+
+
+@pytest.mark.parametrize("host, expected", [
+    ("www.bbc.co.uk", "bbc.co.uk"),
+    ("bbc.co.uk", "bbc.co.uk"),
+    ("co.uk", "co.uk"),
+    ("uk", "uk"),
+    # *.ck with the !www.ck exception
+    ("foo.bar.ck", "foo.bar.ck"),
+    ("bar.ck", "bar.ck"),
+    ("www.ck", "www.ck"),
+    ("a.b.www.ck", "www.ck"),
+    # *.kawasaki.jp with !city.kawasaki.jp
+    ("y.z.kawasaki.jp", "y.z.kawasaki.jp"),
+    ("z.kawasaki.jp", "z.kawasaki.jp"),
+    ("city.kawasaki.jp", "city.kawasaki.jp"),
+    ("x.city.kawasaki.jp", "city.kawasaki.jp"),
+    # Default rule: an unlisted TLD is a public suffix
+    ("a.b.c.unknowntld", "c.unknowntld"),
+    # IDNA rules match both Unicode and punycode hosts
+    ("a.b.пример.рф", "пример.рф"),
+    ("a.b.xn--e1afmkfd.xn--p1ai", "xn--e1afmkfd.xn--p1ai"),
+    # IPs and single labels are returned as-is
+    ("192.168.0.1", "192.168.0.1"),
+    ("[::1]", "[::1]"),
+    ("localhost", "localhost"),
+    ("", ""),
+])
+def test_registrable_domain(host, expected):
+    assert registrable_domain(host) == expected
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.bbc.co.uk/news?x=1#top", "www.bbc.co.uk"),
+    ("example.com:8080/x", "example.com"),
+    ("http://user:pw@Sub.Example.COM./a?b", "sub.example.com"),
+    ("//cdn.example.org/x", "cdn.example.org"),
+    ("http://[::1]:80/", "[::1]"),
+    ("  https://a.com  ", "a.com"),
+])
+def test_extract_host(url, expected):
+    assert extract_host(url) == expected
+
+
+def test_extract_domain_fast_private_suffixes_excluded_by_default():
+    assert extract_domain_fast("https://foo.blogspot.com/post") == "blogspot.com"
+
+
+def test_write_domains_csv_keeps_input_order_and_quotes_like_csv_module():
+    text = 'https://b.example.com/x\n\n  www.a.co.uk  \r\nhttp://c.de/?q="a",b\n'
+    out = io.StringIO()
+    assert write_domains_csv(io.StringIO(text), out) == 3
+    assert out.getvalue() == (
+        "URL,Domain\r\n"
+        "https://b.example.com/x,example.com\r\n"
+        "www.a.co.uk,a.co.uk\r\n"
+        '"http://c.de/?q=""a"",b",c.de\r\n'
+    )
+
+
+def test_write_domains_csv_accepts_lists():
+    out = io.StringIO()
+    assert write_domains_csv(["a.com", "", "b.a.com"], out) == 2
+    assert out.getvalue() == "URL,Domain\r\na.com,a.com\r\nb.a.com,a.com\r\n"
+
+
+def test_aggregate_counts_and_first_lines():
+    text = "b.com\n\nx.a.com\nb.com\r\na.com\nlast.co.uk"
+    counts, first_lines = aggregate_domains(io.StringIO(text))
+    assert counts == {"b.com": 2, "a.com": 2, "last.co.uk": 1}
+    assert first_lines == {"b.com": 1, "a.com": 3, "last.co.uk": 6}
+
+    out = io.StringIO()
+    assert write_aggregate_csv(io.StringIO(text), out) == (5, 3)
+    assert out.getvalue() == "Domain,Count,First Line\r\nb.com,2,1\r\na.com,2,3\r\nlast.co.uk,1,6\r\n"
+
+
+def test_block_boundaries_preserve_lines(monkeypatch):
+    import domains
+    monkeypatch.setattr(domains, "BLOCK_SIZE", 7)
+    lines = [f"https://s{i}.example{i % 3}.com/path" for i in range(50)]
+    lines[10] = ""
+    counts, first_lines = aggregate_domains(io.StringIO("\n".join(lines)))
+    assert sum(counts.values()) == 49
+    assert first_lines == {"example0.com": 1, "example1.com": 2, "example2.com": 3}
+    out = io.StringIO()
+    assert write_domains_csv(io.StringIO("\n".join(lines) + "\n"), out) == 49
+    assert out.getvalue().splitlines()[1:] == [f"{l},example{i % 3}.com" for i, l in enumerate(lines) if l]
+
+
+@pytest.mark.parametrize("block_size", [1, 16, 64, 1 << 20])
+def test_aggregate_matches_line_by_line_count(monkeypatch, block_size):
+    import domains
+    monkeypatch.setattr(domains, "BLOCK_SIZE", block_size)
+    hosts = ["a.com", "b.com", "a.com", "c.co.uk", "x.b.com", "d.com", "", "e,f.com", "c.co.uk", "g.com"]
+    lines = [f"https://{h}/p" if h else "" for h in hosts * 3]
+    counts, first_lines = {}, {}
+    for no, line in enumerate(lines, 1):
+        if line:
+            domain = extract_domain_fast(line)
+            counts[domain] = counts.get(domain, 0) + 1
+            first_lines.setdefault(domain, no)
+    got_counts, got_first = aggregate_domains(io.StringIO("\n".join(lines)))
+    assert got_counts == counts and list(got_first.items()) == list(first_lines.items())
+
+    out = io.StringIO()
+    assert write_aggregate_csv(io.StringIO("\n".join(lines)), out) == (27, 6)
+    rows = out.getvalue().split("\r\n")
+    assert rows[1:4] == ["a.com,6,1", "b.com,6,2", "c.co.uk,6,4"]
+    assert '"e,f.com",3,8' in rows
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import csv
+import gzip
+import json
+
+import pytest
+
+pytest.importorskip("openpyxl")
+
+from exporters import export_rows, ordered_fields, parse_counter, compress_if_too_large
+
+ROWS = [
+    {"title": "Plain", "views": 10, "url": "https://a"},
+    {"title": 'Comma, "quoted"', "url": "https://b"},
+    {"title": "Ünïcode ✓", "views": "1,034", "url": "https://c"},
+]
+# Column T sorts before AA, though "AA" < "T" as plain strings.
+MAPPING = {"url": "AA", "title": "B", "views": "T"}
+
+
+def test_ordered_fields_follow_template_columns():
+    assert ordered_fields(MAPPING) == ["title", "views", "url"]
+    assert ordered_fields({"a": "AB", "b": "Z", "c": "A", "d": "AA"}) == ["c", "b", "d", "a"]
+
+
+@pytest.mark.parametrize("fmt, opener", [("csv", open), ("csv.gz", gzip.open)])
+def test_csv_export(tmp_path, fmt, opener):
+    path = str(tmp_path / f"out.{fmt}")
+    assert export_rows(iter(ROWS), MAPPING, fmt, path) == 3
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        assert list(csv.reader(f)) == [
+            ["title", "views", "url"],
+            ["Plain", "10", "https://a"],
+            ['Comma, "quoted"', "N/A", "https://b"],
+            ["Ünïcode ✓", "1,034", "https://c"],
+        ]
+
+
+@pytest.mark.parametrize("fmt, opener", [("jsonl", open), ("jsonl.gz", gzip.open)])
+def test_jsonl_export(tmp_path, fmt, opener):
+    path = str(tmp_path / f"out.{fmt}")
+    assert export_rows(iter(ROWS), MAPPING, fmt, path) == 3
+    with opener(path, "rt", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert "Ünïcode ✓" in lines[2]
+    records = [json.loads(line) for line in lines]
+    assert [list(record) for record in records] == [["title", "views", "url"]] * 3
+    assert records[1] == {"title": 'Comma, "quoted"', "views": "N/A", "url": "https://b"}
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        export_rows(ROWS, MAPPING, "xml", str(tmp_path / "out.xml"))
+
+
+def test_compress_if_too_large(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("a,b\n" * 100, encoding="utf-8")
+    assert compress_if_too_large(str(path), limit=10_000) == str(path)
+    gz_path = compress_if_too_large(str(path), limit=100)
+    assert gz_path == str(path) + ".gz" and not path.exists()
+    with gzip.open(gz_path, "rt", encoding="utf-8") as f:
+        assert f.read() == "a,b\n" * 100
+
+
+def test_parquet_counters_are_nullable_int64(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "out.parquet")
+    rows = [
+        {"source_url": "a", "views": 1200, "likes": "1,034", "comments": "N/A", "duration": "0:12"},
+        {"source_url": "b", "views": "Error", "likes": 5, "comments": 7, "duration": 30},
+    ]
+    mapping = {"source_url": "A", "views": "B", "likes": "C", "comments": "D", "duration": "E"}
+    assert export_rows(rows, mapping, "parquet", path) == 2
+    table = pq.read_table(path)
+    assert table.schema.field("views").type == pa.int64()
+    assert table.schema.field("duration").type == pa.string()
+    assert table.column("views").to_pylist() == [1200, None]
+    assert table.column("likes").to_pylist() == [1034, 5]
+    assert table.column("comments").to_pylist() == [None, 7]
+    assert table.column("duration").to_pylist() == ["0:12", "30"]
+
+
+@pytest.mark.parametrize("value, expected", [
+    (12, 12), ("1,234", 1234), (" 56 ", 56), (3.0, 3),
+    ("1.5", None), ("1.234", None), (2.5, None), ("1.2K", None),
+    ("N/A", None), ("Error", None), (None, None), (True, None),
+])
+def test_parse_counter(value, expected):
+    assert parse_counter(value) == expected
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+import json
+import asyncio
+
+import pytest
+
+import scrapers
+
+
+def _post(t, pinned=False):
+    return {"video_id": f"v{t}", "create_time": t, "is_top": int(pinned), "play_count": t}
+
+
+class FakeChannel:
+    # Serves a newest-first post list through a stubbed get_channel_videos, 35 per page.
+    def __init__(self, posts, fail_pages=()):
+        self.posts = posts
+        self.fail_pages = set(fail_pages)
+        self.pages = 0
+
+    async def get_channel_videos(self, session, username, cursor=0):
+        self.pages += 1
+        if self.pages in self.fail_pages:
+            return {"videos": [], "has_more": False, "cursor": 0, "error": "HTTP 500"}
+        page = self.posts[cursor:cursor + 35]
+        return {"videos": page, "has_more": cursor + 35 < len(self.posts), "cursor": cursor + 35}
+
+
+@pytest.fixture
+def channel(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    async def no_followers(session, username):
+        return 0
+
+    async def no_sleep(seconds):
+        pass
+
+    def install(posts, fail_pages=()):
+        fake = FakeChannel(posts, fail_pages)
+        monkeypatch.setattr(scrapers, "get_channel_videos", fake.get_channel_videos)
+        return fake
+
+    monkeypatch.setattr(scrapers, "get_user_stats", no_followers)
+    monkeypatch.setattr(scrapers.asyncio, "sleep", no_sleep)
+    return install
+
+
+def _crawl(scope=1, refresh_recent=0):
+    rows = asyncio.run(scrapers.tiktok_channel_posts_scraper(
+        ["https://www.tiktok.com/@someone"], delta=True, refresh_recent=refresh_recent, scope=scope))
+    return [row["views"] for row in rows]
+
+
+def _state():
+    with open(scrapers.TIKTOK_CHANNEL_STATE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _seed(boundary, scope=1):
+    scrapers.save_channel_state({f"{scope}:someone": {"video_id": f"v{boundary}", "create_time": boundary}})
+
+
+def test_first_crawl_is_full_and_sets_boundary(channel):
+    channel([_post(t) for t in range(50, 0, -1)])
+    assert _crawl() == list(range(50, 0, -1))
+    assert _state() == {"1:someone": {"video_id": "v50", "create_time": 50}}
+
+
+def test_delta_stops_at_boundary(channel):
+    fake = channel([_post(t) for t in range(100, 0, -1)])
+    _seed(10)
+    assert _crawl() == list(range(100, 10, -1))
+    assert fake.pages == 3
+    assert _state()["1:someone"]["create_time"] == 100
+
+
+def test_pinned_old_posts_do_not_end_the_crawl(channel):
+    channel([_post(3, pinned=True)] + [_post(t) for t in range(20, 0, -1)])
+    _seed(10)
+    assert _crawl() == list(range(20, 10, -1))
+    assert _state()["1:someone"]["create_time"] == 20
+
+
+def test_refresh_recent_keeps_newest_seen_posts(channel):
+    channel([_post(t) for t in range(20, 0, -1)])
+    _seed(10)
+    assert _crawl(refresh_recent=3) == list(range(20, 7, -1))
+
+
+def test_failed_page_keeps_old_boundary(channel):
+    posts = [_post(t) for t in range(100, 0, -1)]
+    channel(posts, fail_pages={2})
+    _seed(10)
+    assert _crawl() == list(range(100, 65, -1))
+    assert _state()["1:someone"]["create_time"] == 10
+    # The next run still delivers everything past the old boundary.
+    channel(posts)
+    assert _crawl() == list(range(100, 10, -1))
+    assert _state()["1:someone"]["create_time"] == 100
+
+
+def test_boundaries_are_per_chat(channel):
+    channel([_post(t) for t in range(30, 0, -1)])
+    _seed(25, scope=1)
+    assert _crawl(scope=1) == list(range(30, 25, -1))
+    assert _crawl(scope=2) == list(range(30, 0, -1))
+    assert set(_state()) == {"1:someone", "2:someone"}
+
+
+def test_save_merges_with_state_written_during_crawl(channel, monkeypatch):
+    fake = channel([_post(t) for t in range(40, 0, -1)])
+    _seed(10)
+    original = fake.get_channel_videos
+
+    async def concurrent_save(*args):
+        # Another job saves while this crawl is running.
+        state = scrapers.load_channel_state()
+        state["2:someone"] = {"video_id": "v5", "create_time": 5}
+        state["1:someone"] = {"video_id": "v99", "create_time": 99}
+        scrapers.save_channel_state(state)
+        return await original(*args)
+
+    monkeypatch.setattr(scrapers, "get_channel_videos", concurrent_save)
+    _crawl()
+    assert _state() == {
+        "1:someone": {"video_id": "v99", "create_time": 99},
+        "2:someone": {"video_id": "v5", "create_time": 5},
+    }
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("https://www.youtube.com/@some.channel", ("handle", "@some.channel")),
+    ("https://youtube.com/@some-channel/videos", ("handle", "@some-channel")),
+    ("@somechannel", ("handle", "@somechannel")),
+    ("@somechannel/videos", ("handle", "@somechannel")),
+    ("https://www.youtube.com/channel/UC" + "a" * 22, ("id", "UC" + "a" * 22)),
+    ("  UC" + "b_-" * 7 + "c  ", ("id", "UC" + "b_-" * 7 + "c")),
+    ("https://www.youtube.com/user/OldName", ("username", "OldName")),
+    ("https://www.youtube.com/c/CustomName", None),
+    ("https://www.youtube.com/channel/UCshort", None),
+    ("not a channel", None),
+])
+def test_extract_youtube_channel_ref(value, expected):
+    assert scrapers.extract_youtube_channel_ref(value) == expected
+
+
+class FakeResponse:
+    def __init__(self, status, data):
+        self.status = status
+        self.data = data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return self.data
+
+
+class FakeSession:
+    # Serves playlistItems pages keyed by pageToken ("" for the first page); a page
+    # given as an int is returned as that HTTP status.
+    def __init__(self, pages):
+        self.pages = pages
+        self.urls = []
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        token = url.split("&pageToken=")[1] if "&pageToken=" in url else ""
+        page = self.pages[token]
+        if isinstance(page, int):
+            return FakeResponse(page, {})
+        return FakeResponse(200, page)
+
+
+def _items(*ids):
+    return [{"contentDetails": {"videoId": vid}} for vid in ids]
+
+
+def test_channel_id_maps_to_uploads_playlist_without_a_request():
+    session = FakeSession({})
+    ref = ("id", "UC" + "x" * 22)
+    assert asyncio.run(scrapers.resolve_youtube_uploads_playlist(session, ref)) == "UU" + "x" * 22
+    assert session.urls == []
+
+
+def test_playlist_paging_follows_page_tokens():
+    session = FakeSession({
+        "": {"items": _items("a", "b"), "nextPageToken": "p2"},
+        "p2": {"items": _items("c"), "nextPageToken": "p3"},
+        "p3": {"items": _items("d")},
+    })
+    ids, complete = asyncio.run(scrapers.fetch_playlist_video_ids(session, "UUxyz"))
+    assert (ids, complete) == (["a", "b", "c", "d"], True)
+    assert len(session.urls) == 3
+    assert all("playlistId=UUxyz" in url for url in session.urls)
+
+
+def test_playlist_paging_error_is_reported_as_partial():
+    session = FakeSession({
+        "": {"items": _items("a", "b"), "nextPageToken": "p2"},
+        "p2": 403,
+    })
+    assert asyncio.run(scrapers.fetch_playlist_video_ids(session, "UUxyz")) == (["a", "b"], False)
+
+
+def test_channel_scraper_lists_partly_fetched_channels(monkeypatch):
+    pages = {
+        "UU" + "a" * 22: {"": {"items": _items("a1", "shared")}},
+        "UU" + "b" * 22: {"": {"items": _items("b1", "shared"), "nextPageToken": "p2"}, "p2": 500},
+    }
+
+    class Session(FakeSession):
+        def __init__(self):
+            super().__init__({})
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        def get(self, url, timeout=None):
+            self.pages = pages[url.split("playlistId=")[1].split("&")[0]]
+            return super().get(url, timeout)
+
+    async def by_ids(video_ids):
+        return video_ids
+
+    monkeypatch.setattr(scrapers.aiohttp, "ClientSession", Session)
+    monkeypatch.setattr(scrapers, "youtube_videos_by_ids", by_ids)
+    incomplete = []
+    urls = ["https://www.youtube.com/channel/UC" + "a" * 22, "UC" + "b" * 22]
+    assert asyncio.run(scrapers.youtube_channel_scraper(urls, incomplete)) == ["a1", "shared", "b1"]
+    assert incomplete == ["UC" + "b" * 22]
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+import timeseries
+from timeseries import TimeSeriesStore, MISSING
+
+
+def _points(store, **kwargs):
+    return sorted(store.points(**kwargs))
+
+
+def test_round_trip_keeps_values(tmp_path, monkeypatch):
+    # Small batches and chunks so the streaming encoder/decoder cross chunk boundaries.
+    monkeypatch.setattr(timeseries, "WRITE_BATCH", 7)
+    monkeypatch.setattr(timeseries, "DECODE_CHUNK", 24)
+    store = TimeSeriesStore(str(tmp_path))
+    rows = [(f"k{i % 5}", 1000 + i, i * 1_000_003, MISSING if i % 3 else -i, 2 ** 62 - i) for i in range(200)]
+    assert store.append(rows) == 200
+    expected = sorted((store.series_id(k), ts, v, l, s) for k, ts, v, l, s in rows)
+    assert _points(store) == expected
+    assert _points(TimeSeriesStore(str(tmp_path))) == expected
+
+
+def test_compact_merges_segments_and_splits_by_series(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeseries, "COMPACT_SEGMENT_POINTS", 10)
+    store = TimeSeriesStore(str(tmp_path))
+    for ts in range(5):
+        store.append([(f"s{i}", ts, ts * i, i, MISSING) for i in range(20)])
+    before = _points(store)
+    store.compact()
+    segments = store._segments()
+    assert len(segments) == 10
+    assert _points(store) == before
+    ranges = [store._header(seg)[1:3] for seg in segments]
+    assert ranges == sorted(ranges)
+    assert all(hi < lo for (_, hi), (lo, _) in zip(ranges, ranges[1:]))
+
+
+def test_points_skips_unrelated_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeseries, "COMPACT_SEGMENT_POINTS", 10)
+    store = TimeSeriesStore(str(tmp_path))
+    for ts in range(3):
+        store.append([(f"s{i}", 100 + ts, i, i, i) for i in range(30)])
+    store.compact()
+    read = []
+    original = store._read_segment
+    monkeypatch.setattr(store, "_read_segment", lambda seg: read.append(seg) or original(seg))
+    sid = store.series_id("s25")
+    assert _points(store, series_ids=[sid]) == [(sid, 100 + ts, 25, 25, 25) for ts in range(3)]
+    assert len(read) == 1
+    read.clear()
+    assert _points(store, since=1000) == []
+    assert read == []
+
+
+def test_auto_compaction_keeps_every_point(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeseries, "MAX_SEGMENTS", 4)
+    store = TimeSeriesStore(str(tmp_path))
+    for ts in range(12):
+        store.append([("a", ts, ts, 0, 0), ("b", ts, -ts, 0, 0)])
+    assert len(store._segments()) <= 5
+    assert len(_points(store)) == 24
+
+
+def test_rejects_corrupt_segments(tmp_path):
+    with open(os.path.join(tmp_path, "1.seg"), "wb") as f:
+        f.write(b"nope")
+    with pytest.raises(ValueError):
+        list(TimeSeriesStore(str(tmp_path)).points())
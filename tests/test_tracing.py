@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from tracing import (
+    PHASES, JobTrace, span, record_span, start_trace, end_trace, redact_url,
+    start_profile, end_profile, run_in_executor, profile_report
+)
+
+
+def _worker_only_function(n):
+    return sum(range(n))
+
+
+def test_profile_covers_executor_threads():
+    async def job():
+        profiles, token = start_profile()
+        try:
+            assert await run_in_executor(_worker_only_function, 1000) == 499500
+        finally:
+            end_profile(profiles, token)
+        return profiles
+
+    profiles = asyncio.run(job())
+    assert len(profiles) == 2
+    assert "_worker_only_function" in profile_report(profiles, limit=1000)
+
+
+def test_run_in_executor_without_profile():
+    assert asyncio.run(run_in_executor(_worker_only_function, 10)) == 45
+
+
+def test_span_is_a_noop_without_a_trace():
+    with span("http", "untraced"):
+        pass
+    record_span("parsing", "untraced", 0.0)
+    trace, token = start_trace("job")
+    end_trace(trace, token)
+    assert trace.spans == []
+    with span("http", "after the job"):
+        pass
+    assert trace.spans == []
+
+
+def test_span_records_phase_label_and_timing():
+    trace, token = start_trace("job")
+    try:
+        with span("http", "first"):
+            pass
+        with pytest.raises(RuntimeError):
+            with span("parsing", "failing"):
+                raise RuntimeError
+    finally:
+        end_trace(trace, token)
+    assert [(phase, label) for phase, label, _, _ in trace.spans] == [("http", "first"), ("parsing", "failing")]
+    assert all(offset >= 0 and duration >= 0 for _, _, offset, duration in trace.spans)
+
+
+def _trace(spans, wall=10.0):
+    trace = JobTrace("job")
+    for phase, label, offset, duration in spans:
+        trace.add(phase, label, trace.started + offset, duration)
+    trace.finished = trace.started + wall
+    return trace
+
+
+def test_phase_totals():
+    trace = _trace([("http", "a", 0, 2.0), ("http", "b", 1, 1.5), ("output", "c", 5, 0.5), ("custom", "d", 6, 1.0)])
+    totals = trace.phase_totals()
+    assert list(totals)[:len(PHASES)] == list(PHASES)
+    assert totals["http"] == [3.5, 2]
+    assert totals["output"] == [0.5, 1]
+    assert totals["ingestion"] == [0.0, 0]
+    assert totals["custom"] == [1.0, 1]
+
+
+def test_summary_lists_phases_and_slowest_requests_first():
+    trace = _trace([("http", f"req{i}", i, duration) for i, duration in enumerate([0.5, 3.0, 1.0, 2.0])]
+                   + [("parsing", "p", 5, 1.0)])
+    lines = trace.summary(top=3).splitlines()
+    assert lines[:4] == ["Trace: job", "Wall time: 10.00s", "", "Time by phase:"]
+    assert lines[4].split() == ["http", "6.50s", "65.0%", "(4", "spans)"]
+    assert lines[5].split()[:2] == ["parsing", "1.00s"]
+    assert lines[6].split()[:2] == ["other", "2.50s"]
+    top = lines[lines.index("Top 3 slowest requests:") + 1:]
+    assert [line.split()[-1] for line in top] == ["req1", "req3", "req2"]
+    assert top[0] == "     3.00s  @    1.00s  req1"
+
+
+def test_summary_notes_overlapping_spans():
+    trace = _trace([("http", "a", 0, 8.0), ("http", "b", 0, 8.0)])
+    assert "concurrent spans overlap" in trace.summary()
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://api.example/v3/videos?id=1&key=SECRET", "https://api.example/v3/videos?id=1&key=***"),
+    ("https://api.example/v3/videos?key=SECRET&id=1", "https://api.example/v3/videos?key=***&id=1"),
+    ("https://api.example/v3/videos?monkey=1&id=2", "https://api.example/v3/videos?monkey=1&id=2"),
+    ("https://api.example/v3/videos", "https://api.example/v3/videos"),
+])
+def test_redact_url(url, expected):
+    assert redact_url(url) == expected
+
+
+def test_span_labels_never_carry_api_keys():
+    trace, token = start_trace("job")
+    try:
+        with span("http", "https://api.example/v3/channels?part=snippet&key=SECRET"):
+            pass
+        record_span("http", "GET ?key=SECRET&pageToken=x", trace.started)
+    finally:
+        end_trace(trace, token)
+    labels = [label for _, label, _, _ in trace.spans]
+    assert labels == ["https://api.example/v3/channels?part=snippet&key=***", "GET ?key=***&pageToken=x"]
+    assert "SECRET" not in trace.summary()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def watchlist(tmp_path, monkeypatch):
+    monkeypatch.setenv("WATCHLIST_FILE", str(tmp_path / "watchlists.json"))
+    monkeypatch.setenv("TIMESERIES_DIR", str(tmp_path / "timeseries"))
+    import watchlist
+    module = importlib.reload(watchlist)
+    yield module
+    module._store = None
+
+
+def test_ids_are_never_reused(watchlist):
+    first = watchlist.add_watch(1, "youtube", ["u"], 1)
+    second = watchlist.add_watch(1, "youtube", ["u"], 1)
+    assert watchlist.remove_watch(1, second["id"])
+    third = watchlist.add_watch(2, "youtube", ["u"], 1)
+    assert (first["id"], second["id"], third["id"]) == (1, 2, 3)
+
+
+def test_series_are_scoped_to_chat(watchlist):
+    mine = {"id": 1, "chat_id": 1}
+    other = {"id": 1, "chat_id": 2}
+    watchlist.record_snapshot(mine, [{"source_url": "u", "views": "10", "likes": "N/A"}], ts=100)
+    watchlist.record_snapshot(mine, [{"source_url": "u", "views": "1,500", "likes": "3"}], ts=200)
+    rows = watchlist.growth_rows(mine)
+    assert len(rows) == 1
+    assert rows[0]["source_url"] == "u"
+    assert (rows[0]["views_start"], rows[0]["views_end"], rows[0]["views_delta"]) == (10, 1500, 1490)
+    assert rows[0]["likes_delta"] == "N/A"
+    assert watchlist.growth_rows(other) == []
+
+
+def test_channel_watches_crawl_in_full(watchlist):
+    assert watchlist.add_watch(1, "tiktok_channel", ["u"], 1)["tiktok_mode"] == "channel_posts"
+
+
+def test_snapshots_and_exports_from_worker_threads(watchlist, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    import timeseries
+    monkeypatch.setattr(timeseries, "MAX_SEGMENTS", 2)
+    watch = {"id": 1, "chat_id": 1}
+    rows = [{"source_url": f"u{i}", "views": "5"} for i in range(20)]
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(watchlist.record_snapshot, watch, rows, ts) for ts in range(1, 41)]
+        futures += [pool.submit(watchlist.growth_rows, watch) for _ in range(40)]
+        for future in futures:
+            future.result()
+    rows = watchlist.growth_rows(watch)
+    assert len(rows) == 20
+    assert all(row["snapshots"] == 40 for row in rows)
+
+
+def test_snapshot_counters_keep_decimal_points(watchlist):
+    watch = {"id": 1, "chat_id": 1}
+    watchlist.record_snapshot(watch, [{"source_url": "u", "views": "1.5", "likes": "1,234", "subscribers": 7}], ts=1)
+    row = watchlist.growth_rows(watch)[0]
+    assert (row["views_start"], row["likes_start"], row["subs_start"]) == ("N/A", 1234, 7)
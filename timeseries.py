@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import time
+import zlib
+import heapq
+import struct
+from bisect import bisect_left
+from array import array
+from itertools import accumulate
+from typing import Dict, List, Tuple, Iterable, Iterator, Optional
+
+# Compact columnar store for metric snapshots.
+# Series keys (e.g. "<chat id>|<watch id>|<video url>") are integer-encoded through an append-only
+# key file; points are written in segments sorted by (series, ts) where every column is
+# delta-encoded as int64 and zlib-compressed, so repeated snapshots of slowly growing
+# counters shrink to a few bytes per point. Segment headers carry the series-id and ts
+# range so reads only decode segments that can hold the requested series.
+
+COLUMNS = ("series", "ts", "views", "likes", "subs")
+MISSING = -1
+SEGMENT_MAGIC = b"TSS1"
+# count, min/max series id, min/max ts: lets reads skip segments without decoding them.
+SEGMENT_HEADER = struct.Struct("<Iqqqq")
+SEGMENT_SUFFIX = ".seg"
+KEYS_FILE = "series.keys"
+MAX_SEGMENTS = 64
+# Compaction output is split into segments of about this many points (cut between series),
+# so each covers a narrow series-id range.
+COMPACT_SEGMENT_POINTS = 1 << 16
+WRITE_BATCH = 1 << 14
+DECODE_CHUNK = 1 << 13
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+Point = Tuple[int, int, int, int, int]
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tobytes()
+
+def _iter_decoded(blob: bytes) -> Iterator[int]:
+    # Decompresses and un-deltas a column a chunk at a time.
+    decompressor = zlib.decompressobj()
+    total = 0
+    pending = b""
+    while True:
+        if blob:
+            chunk = decompressor.decompress(blob, DECODE_CHUNK)
+            blob = decompressor.unconsumed_tail
+        else:
+            chunk = decompressor.flush()
+        data = pending + chunk
+        usable = len(data) - len(data) % 8
+        if usable:
+            deltas = array("q")
+            deltas.frombytes(data[:usable])
+            if sys.byteorder != "little":
+                deltas.byteswap()
+            deltas[0] += total
+            values = list(accumulate(deltas))
+            total = values[-1]
+            yield from values
+        pending = data[usable:]
+        if not blob and not chunk:
+            break
+    if pending:
+        raise ValueError("Truncated time-series column")
+
+class _SegmentWriter:
+    # Streams points, already sorted by (series, ts), into a segment file. Only the
+    # compressed columns are kept in memory until close().
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._batch: List[Point] = []
+        self._prev = [0] * len(COLUMNS)
+        self._compressors = [zlib.compressobj(6) for _ in COLUMNS]
+        self._blobs = [bytearray() for _ in COLUMNS]
+        self._series = [None, None]
+        self._ts = [_INT64_MAX, _INT64_MIN]
+
+    def add(self, point: Point):
+        self._batch.append(point)
+        self.count += 1
+        if len(self._batch) >= WRITE_BATCH:
+            self._flush()
+
+    def _flush(self):
+        if not self._batch:
+            return
+        for col, values in enumerate(zip(*self._batch)):
+            deltas = array("q", [b - a for a, b in zip((self._prev[col],) + values[:-1], values)])
+            self._blobs[col] += self._compressors[col].compress(_to_bytes(deltas))
+            self._prev[col] = values[-1]
+            if col == 1:
+                self._ts = [min(self._ts[0], min(values)), max(self._ts[1], max(values))]
+        if self._series[0] is None:
+            self._series[0] = self._batch[0][0]
+        self._series[1] = self._batch[-1][0]
+        self._batch.clear()
+
+    def close(self):
+        self._flush()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(SEGMENT_MAGIC)
+            f.write(SEGMENT_HEADER.pack(self.count, self._series[0], self._series[1], self._ts[0], self._ts[1]))
+            for compressor, blob in zip(self._compressors, self._blobs):
+                blob += compressor.flush()
+                f.write(struct.pack("<I", len(blob)))
+                f.write(blob)
+        os.replace(tmp_path, self.path)
+
+class TimeSeriesStore:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._keys: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._headers: Dict[str, Tuple[int, int, int, int, int]] = {}
+        keys_path = os.path.join(path, KEYS_FILE)
+        if os.path.isfile(keys_path):
+            with open(keys_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    key = line.rstrip("\n")
+                    self._ids[key] = len(self._keys)
+                    self._keys.append(key)
+
+    def series_id(self, key: str) -> int:
+        key = key.replace("\n", " ").strip()
+        if key in self._ids:
+            return self._ids[key]
+        with open(os.path.join(self.path, KEYS_FILE), "a", encoding="utf-8") as f:
+            f.write(key + "\n")
+        self._ids[key] = len(self._keys)
+        self._keys.append(key)
+        return self._ids[key]
+
+    def key(self, series_id: int) -> str:
+        return self._keys[series_id]
+
+    def keys_with_prefix(self, prefix: str) -> Dict[int, str]:
+        return {i: k for i, k in enumerate(self._keys) if k.startswith(prefix)}
+
+    def _segments(self) -> List[str]:
+        return sorted(
+            os.path.join(self.path, name) for name in os.listdir(self.path)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def _write_segment(self, points: List[Point], name: str):
+        writer = _SegmentWriter(os.path.join(self.path, name))
+        for p in sorted(points):
+            writer.add(p)
+        writer.close()
+
+    def _read_header(self, f, seg_path: str) -> Tuple[int, int, int, int, int]:
+        if f.read(4) != SEGMENT_MAGIC:
+            raise ValueError(f"Not a time-series segment: {seg_path}")
+        return SEGMENT_HEADER.unpack(f.read(SEGMENT_HEADER.size))
+
+    def _header(self, seg_path: str) -> Tuple[int, int, int, int, int]:
+        # Segments are immutable once written, so headers are cached by path.
+        header = self._headers.get(seg_path)
+        if header is None:
+            with open(seg_path, "rb") as f:
+                header = self._headers[seg_path] = self._read_header(f, seg_path)
+        return header
+
+    def _read_segment(self, seg_path: str) -> Iterator[Point]:
+        with open(seg_path, "rb") as f:
+            count = self._read_header(f, seg_path)[0]
+            blobs = []
+            for _ in COLUMNS:
+                (size,) = struct.unpack("<I", f.read(4))
+                blobs.append(f.read(size))
+        columns = [_iter_decoded(blob) for blob in blobs]
+        read = 0
+        for point in zip(*columns):
+            read += 1
+            yield point
+        if read != count or any(next(c, None) is not None for c in columns):
+            raise ValueError(f"Corrupt time-series segment: {seg_path}")
+
+    def append(self, points: Iterable[Tuple[str, int, int, int, int]]) -> int:
+        encoded = [(self.series_id(key), ts, views, likes, subs) for key, ts, views, likes, subs in points]
+        if not encoded:
+            return 0
+        self._write_segment(encoded, f"{time.time_ns():020d}{SEGMENT_SUFFIX}")
+        if len(self._segments()) > MAX_SEGMENTS + self._compacted_count():
+            self.compact()
+        return len(encoded)
+
+    def _compacted_count(self) -> int:
+        return sum(1 for seg in self._segments() if "_" in os.path.basename(seg))
+
+    def compact(self):
+        # Streaming k-way merge: every segment is sorted by (series, ts), so points are
+        # decoded lazily and memory holds only the compressed columns.
+        segments = self._segments()
+        if len(segments) < 2:
+            return
+        stamp = time.time_ns()
+        writer = None
+        last_series = None
+        for point in heapq.merge(*(self._read_segment(seg) for seg in segments)):
+            if writer is None or (writer.count >= COMPACT_SEGMENT_POINTS and point[0] != last_series):
+                if writer is not None:
+                    writer.close()
+                part = 0 if writer is None else part + 1
+                writer = _SegmentWriter(os.path.join(self.path, f"{stamp:020d}_{part:04d}{SEGMENT_SUFFIX}"))
+            writer.add(point)
+            last_series = point[0]
+        if writer is not None:
+            writer.close()
+        for seg in segments:
+            os.remove(seg)
+            self._headers.pop(seg, None)
+
+    def points(self, series_ids: Optional[Iterable[int]] = None, since: int = 0) -> Iterator[Point]:
+        wanted = sorted(set(series_ids)) if series_ids is not None else None
+        wanted_set = set(wanted) if wanted is not None else None
+        for seg in self._segments():
+            _, min_series, max_series, _, max_ts = self._header(seg)
+            if max_ts < since:
+                continue
+            if wanted is not None:
+                i = bisect_left(wanted, min_series)
+                if i == len(wanted) or wanted[i] > max_series:
+                    continue
+            for p in self._read_segment(seg):
+                if p[1] < since:
+                    continue
+                if wanted_set is not None and p[0] not in wanted_set:
+                    continue
+                yield p
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import io
+import re
+import time
+import asyncio
+import pstats
+import cProfile
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+
+# Lightweight per-job span timeline. A job installs a JobTrace in a context variable;
+# scrapers record spans with `with span(phase, label):` which is a no-op when no job
+# trace is active. Tasks started by the job inherit the same trace.
+
+PHASES = ("ingestion", "http", "rate_limit", "parsing", "output")
+
+_current_trace = contextvars.ContextVar("job_trace", default=None)
+# cProfile only sees the thread it was enabled in, so a profiled job keeps a list of
+# profilers: one for the event loop plus one per callable it hands to the executor.
+_current_profiles = contextvars.ContextVar("job_profiles", default=None)
+
+def redact_url(url: str) -> str:
+    return re.sub(r"([?&]key=)[^&]+", r"\1***", url)
+
+class JobTrace:
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.finished = None
+        self.spans: List[Tuple[str, str, float, float]] = []
+
+    def add(self, phase: str, label: str, start: float, duration: float):
+        # Labels end up in reports sent to chats, so API keys are masked here as well.
+        self.spans.append((phase, redact_url(label), start - self.started, duration))
+
+    @property
+    def wall_time(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def phase_totals(self):
+        totals = {phase: [0.0, 0] for phase in PHASES}
+        for phase, _, _, duration in self.spans:
+            entry = totals.setdefault(phase, [0.0, 0])
+            entry[0] += duration
+            entry[1] += 1
+        return totals
+
+    def one_line(self) -> str:
+        totals = self.phase_totals()
+        parts = [f"{phase}={totals[phase][0]:.1f}s" for phase in totals if totals[phase][1]]
+        return f"{self.name}: {self.wall_time:.1f}s total, " + ", ".join(parts)
+
+    def summary(self, top: int = 10) -> str:
+        wall = self.wall_time
+        totals = self.phase_totals()
+        lines = [f"Trace: {self.name}", f"Wall time: {wall:.2f}s", "", "Time by phase:"]
+        for phase, (total, count) in totals.items():
+            if count:
+                lines.append(f"  {phase:<11}{total:9.2f}s {100 * total / wall if wall else 0:5.1f}%  ({count} spans)")
+        accounted = sum(total for total, _ in totals.values())
+        if accounted <= wall:
+            lines.append(f"  {'other':<11}{wall - accounted:9.2f}s {100 * (wall - accounted) / wall if wall else 0:5.1f}%")
+        else:
+            lines.append("  (concurrent spans overlap, phases add up to more than wall time)")
+        requests = sorted((s for s in self.spans if s[0] == "http"), key=lambda s: s[3], reverse=True)
+        if requests:
+            lines += ["", f"Top {min(top, len(requests))} slowest requests:"]
+            for _, label, offset, duration in requests[:top]:
+                lines.append(f"  {duration:7.2f}s  @{offset:8.2f}s  {label}")
+        return "\n".join(lines) + "\n"
+
+def start_trace(name: str):
+    trace = JobTrace(name)
+    return trace, _current_trace.set(trace)
+
+def end_trace(trace: JobTrace, token):
+    trace.finished = time.perf_counter()
+    _current_trace.reset(token)
+
+def record_span(phase: str, label: str, start: float):
+    # For spans that are awkward to wrap in a with block: start is a time.perf_counter() value.
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(phase, label, start, time.perf_counter() - start)
+
+@contextmanager
+def span(phase: str, label: str = ""):
+    if _current_trace.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(phase, label, start)
+
+def start_profile():
+    profiler = cProfile.Profile()
+    profiles = [profiler]
+    token = _current_profiles.set(profiles)
+    profiler.enable()
+    return profiles, token
+
+def end_profile(profiles: List[cProfile.Profile], token):
+    profiles[0].disable()
+    _current_profiles.reset(token)
+
+def _profiled(func: Callable, profiles: List[cProfile.Profile]) -> Callable:
+    def run(*args):
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args)
+        finally:
+            profiles.append(profiler)
+    return run
+
+async def run_in_executor(func: Callable, *args):
+    # loop.run_in_executor that also profiles func in the worker thread when the job is profiled.
+    profiles = _current_profiles.get()
+    if profiles is not None:
+        func = _profiled(func, profiles)
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+def profile_report(profiles: List[cProfile.Profile], limit: int = 60) -> str:
+    out = io.StringIO()
+    stats = pstats.Stats(*profiles, stream=out)
+    stats.sort_stats("cumulative").print_stats(limit)
+    out.write("\n")
+    stats.sort_stats("tottime").print_stats(limit)
+    return out.getvalue()
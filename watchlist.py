@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import time
+import threading
+from typing import List, Dict, Optional
+from timeseries import TimeSeriesStore, MISSING
+from exporters import parse_counter
+
+WATCHLIST_FILE = os.getenv("WATCHLIST_FILE", "watchlists.json")
+TIMESERIES_DIR = os.getenv("TIMESERIES_DIR", "timeseries")
+
+# Command keyword -> (platform, tiktok_mode)
+WATCH_TARGETS = {
+    "youtube": ("YouTube", None),
+    "tiktok": ("TikTok", "post_details"),
+    "tiktok_channel": ("TikTok", "channel_posts"),
+    "dailymotion": ("Dailymotion", None),
+    "okru": ("Ok.ru", None),
+}
+
+GROWTH_FIELDS = [
+    "source_url", "first_snapshot", "last_snapshot", "snapshots",
+    "views_start", "views_end", "views_delta",
+    "likes_start", "likes_end", "likes_delta",
+    "subs_start", "subs_end", "subs_delta",
+]
+
+_store = None
+# Snapshots and exports run in executor threads; the store is not safe for concurrent use,
+# and compaction deletes segments that a concurrent read may be about to open.
+_store_lock = threading.Lock()
+
+def get_store() -> TimeSeriesStore:
+    global _store
+    if _store is None:
+        _store = TimeSeriesStore(TIMESERIES_DIR)
+    return _store
+
+def _read_file(path: str = WATCHLIST_FILE) -> Dict:
+    # {"next_id": int, "watches": [...]}; next_id only ever grows so a deleted watch's
+    # id (and its series) is never handed to another watch.
+    if not os.path.isfile(path):
+        return {"next_id": 1, "watches": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _write_file(data: Dict, path: str = WATCHLIST_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def load_watchlists(path: str = WATCHLIST_FILE) -> List[Dict]:
+    return _read_file(path)["watches"]
+
+def save_watchlists(watches: List[Dict], path: str = WATCHLIST_FILE):
+    data = _read_file(path)
+    data["watches"] = watches
+    _write_file(data, path)
+
+def add_watch(chat_id: int, keyword: str, targets: List[str], interval_hours: float) -> Dict:
+    data = _read_file()
+    platform, mode = WATCH_TARGETS[keyword]
+    watch = {
+        "id": data["next_id"],
+        "chat_id": chat_id,
+        "platform": platform,
+        "tiktok_mode": mode,
+        "targets": targets,
+        "interval_hours": interval_hours,
+        "last_run": 0,
+    }
+    data["next_id"] += 1
+    data["watches"].append(watch)
+    _write_file(data)
+    return watch
+
+def remove_watch(chat_id: int, watch_id: int) -> bool:
+    watches = load_watchlists()
+    remaining = [w for w in watches if not (w["id"] == watch_id and w["chat_id"] == chat_id)]
+    if len(remaining) == len(watches):
+        return False
+    save_watchlists(remaining)
+    return True
+
+def get_watch(chat_id: int, watch_id: int) -> Optional[Dict]:
+    for w in load_watchlists():
+        if w["id"] == watch_id and w["chat_id"] == chat_id:
+            return w
+    return None
+
+def due_watches(now: float = None) -> List[Dict]:
+    now = now or time.time()
+    return [w for w in load_watchlists() if now - w["last_run"] >= w["interval_hours"] * 3600]
+
+def mark_run(watch_id: int, ts: float):
+    watches = load_watchlists()
+    for w in watches:
+        if w["id"] == watch_id:
+            w["last_run"] = ts
+    save_watchlists(watches)
+
+def _to_int(value) -> int:
+    parsed = parse_counter(value)
+    return MISSING if parsed is None else parsed
+
+def _series_prefix(watch: Dict) -> str:
+    return f"{watch['chat_id']}|{watch['id']}|"
+
+def record_snapshot(watch: Dict, rows: List[Dict], ts: int = None) -> int:
+    ts = ts or int(time.time())
+    prefix = _series_prefix(watch)
+    points = []
+    for row in rows:
+        url = row.get("source_url")
+        if not url:
+            continue
+        subs = row.get("channel_subs", row.get("subscribers", "N/A"))
+        points.append((
+            prefix + url, ts,
+            _to_int(row.get("views", "N/A")), _to_int(row.get("likes", "N/A")), _to_int(subs),
+        ))
+    with _store_lock:
+        return get_store().append(points)
+
+def growth_rows(watch: Dict, since: int = 0) -> List[Dict]:
+    prefix = _series_prefix(watch)
+    series = {}
+    with _store_lock:
+        store = get_store()
+        keys = store.keys_with_prefix(prefix)
+        for sid, ts, views, likes, subs in store.points(keys.keys(), since):
+            series.setdefault(sid, []).append((ts, views, likes, subs))
+
+    def _delta(start, end):
+        return end - start if start != MISSING and end != MISSING else "N/A"
+
+    rows = []
+    for sid, points in series.items():
+        points.sort()
+        first, last = points[0], points[-1]
+        row = {
+            "source_url": keys[sid][len(prefix):],
+            "first_snapshot": time.strftime("%Y-%m-%d %H:%M", time.gmtime(first[0])),
+            "last_snapshot": time.strftime("%Y-%m-%d %H:%M", time.gmtime(last[0])),
+            "snapshots": len(points),
+        }
+        for idx, name in enumerate(("views", "likes", "subs"), start=1):
+            row[f"{name}_start"] = first[idx] if first[idx] != MISSING else "N/A"
+            row[f"{name}_end"] = last[idx] if last[idx] != MISSING else "N/A"
+            row[f"{name}_delta"] = _delta(first[idx], last[idx])
+        rows.append(row)
+    rows.sort(key=lambda r: r["views_delta"] if isinstance(r["views_delta"], int) else -1, reverse=True)
+    return rows